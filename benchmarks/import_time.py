@@ -0,0 +1,66 @@
+"""Import-time benchmark for libtrust.
+
+Each statement runs in a fresh interpreter; `eager` imports what the package
+used to import up front, so it is the baseline for the lazy imports:
+
+    python -m benchmarks.import_time --output import_time.json
+"""
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import timeit
+
+STATEMENTS = (
+    ('interpreter', 'pass'),
+    ('eager', 'import libtrust.ec_key, libtrust.rsa_key'),
+    ('package', 'import libtrust'),
+    ('util', 'import libtrust.util'),
+    ('jsonsign', 'import libtrust.jsonsign'),
+)
+
+
+def measure(statement, repeat):
+    command = [sys.executable, '-c', statement]
+    samples = []
+    for _ in range(repeat):
+        started = timeit.default_timer()
+        subprocess.check_call(command)
+        samples.append(timeit.default_timer() - started)
+    samples.sort()
+    return {
+        'min_ms': round(samples[0] * 1000, 3),
+        'median_ms': round(samples[len(samples) // 2] * 1000, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', '-o', help="write the JSON results to this file instead of stdout")
+    parser.add_argument('--repeat', type=int, default=20, help="interpreter launches per statement (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for name, statement in STATEMENTS:
+        result = dict(name=name, statement=statement, **measure(statement, args.repeat))
+        results.append(result)
+        print('{:<12} {:>10.1f} ms'.format(name, result['median_ms']), file=sys.stderr)
+
+    report = {
+        'meta': {'python': platform.python_version(), 'platform': platform.platform()},
+        'results': results,
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
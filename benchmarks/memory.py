@@ -0,0 +1,83 @@
+"""Memory benchmark for parsed signatures and keys.
+
+Measures the Python heap held per object with `tracemalloc` (memory owned by
+OpenSSL is not included), keeping every object alive like an index would:
+
+    python -m benchmarks.memory --output memory.json
+"""
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import tracemalloc
+
+from libtrust import ec_key
+from libtrust import jsonsign
+from libtrust import key
+from libtrust import rsa_key
+
+TIMESTAMP = 1478423072
+
+
+def measure(build, count):
+    """Return the traced bytes per object of `count` objects made by `build(i)`."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [build(i) for i in range(count)]
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del objects
+    return (after - before) / float(count)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', '-o', help="write the JSON results to this file instead of stdout")
+    parser.add_argument('--count', type=int, default=20000, help="objects kept alive per case (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    private_keys = [rsa_key.generate_private_key(2048), ec_key.generate_private_key('P-256')]
+    js = jsonsign.JSONSignature.from_map({'schemaVersion': 1, 'name': 'library/benchmark'})
+    for private_key in private_keys:
+        js.sign(private_key, timestamp=TIMESTAMP)
+    jws = js.jws()
+    signature_maps = json.loads(jws)['signatures']
+    jwks = [private_key.public_key().to_map() for private_key in private_keys]
+    key.jwk_cache.clear()
+    jsonsign.JSONSignature.parse_jws(jws)
+
+    cases = (
+        # Signatures share their cached public keys, as they do in a real index
+        ('signature', lambda i: jsonsign.JsSignature.from_map(signature_maps[i % 2])),
+        ('json_signature', lambda i: jsonsign.JSONSignature.parse_jws(jws)),
+        ('public_key_rsa', lambda i: key.parse_public_key_jwk(jwks[0], use_cache=False)),
+        ('public_key_ec', lambda i: key.parse_public_key_jwk(jwks[1], use_cache=False)),
+    )
+    results = []
+    for name, build in cases:
+        per_object = measure(build, args.count)
+        results.append({'name': name, 'count': args.count, 'bytes_per_object': round(per_object, 1)})
+        print('{:<16} {:>10.1f} bytes'.format(name, per_object), file=sys.stderr)
+
+    report = {
+        'meta': {'python': platform.python_version(), 'platform': platform.platform()},
+        'results': results,
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
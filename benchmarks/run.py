@@ -0,0 +1,181 @@
+"""Microbenchmarks for the hot paths of libtrust.
+
+Runs offline with freshly generated keys and writes machine-readable JSON:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --quick
+"""
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+
+import cryptography
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from libtrust import ec_key
+from libtrust import jsonsign
+from libtrust import key
+from libtrust import rsa_key
+
+KB = 1024
+MB = 1024 * KB
+
+PAYLOAD_SIZES = (KB, 64 * KB, MB, 10 * MB, 50 * MB)
+QUICK_PAYLOAD_SIZES = (KB, 64 * KB)
+SIGNATURE_COUNTS = (1, 5, 20)
+QUICK_SIGNATURE_COUNTS = (1, 5)
+
+TIMESTAMP = 1478423072
+
+
+def generate_keys():
+    keys = {}
+    for bits in (2048, 4096):
+        crypto_key = rsa.generate_private_key(65537, bits, default_backend())
+        keys['RSA-{}'.format(bits)] = rsa_key.RSAPrivateKey(crypto_key)
+    for curve in (ec.SECP256R1, ec.SECP384R1, ec.SECP521R1):
+        crypto_key = ec.generate_private_key(curve(), default_backend())
+        keys['EC-{}'.format(ec_key.Curves.from_common_name(curve.name).value)] = ec_key.ECPrivateKey(crypto_key)
+    return keys
+
+
+def make_content(size):
+    """A schema1-like manifest whose indented JSON is about `size` bytes."""
+    entry = 'x' * 200
+    count = max(size // (len(entry) + 12), 1)
+    return {
+        'schemaVersion': 1,
+        'name': 'library/benchmark',
+        'history': [entry] * count,
+    }
+
+
+class Runner(object):
+    def __init__(self, min_time, repeat):
+        self.min_time = min_time
+        self.repeat = repeat
+        self.results = []
+
+    def bench(self, name, func, **params):
+        # Calibrate the number of calls per sample to last about `min_time`
+        number = 1
+        while True:
+            elapsed = timeit.timeit(func, number=number)
+            if elapsed >= self.min_time or number >= 1 << 20:
+                break
+            number *= 2 if elapsed <= 0 else max(2, min(int(self.min_time / elapsed) + 1, 10))
+
+        samples = [timeit.timeit(func, number=number) / number for _ in range(self.repeat)]
+        samples.sort()
+        result = {
+            'name': name,
+            'params': params,
+            'number': number,
+            'repeat': self.repeat,
+            'min_ns': int(samples[0] * 1e9),
+            'median_ns': int(samples[len(samples) // 2] * 1e9),
+            'max_ns': int(samples[-1] * 1e9),
+        }
+        self.results.append(result)
+        print('{:<32} {:<40} {:>14,} ns'.format(name, json.dumps(params, sort_keys=True), result['median_ns']),
+              file=sys.stderr)
+        return result
+
+
+def bench_keys(runner, keys):
+    for key_name, private_key in sorted(keys.items()):
+        key_class = type(private_key)
+        public_key = private_key.public_key()
+        public_class = type(public_key)
+        private_pem = private_key.pem_block()
+        public_pem = public_key.pem_block()
+        crypto_public_key = public_key.crypto_public_key()
+        jwk = public_key.to_map()
+
+        runner.bench('from_pem.private', lambda: key_class.from_pem(private_pem), key=key_name)
+        runner.bench('from_pem.public', lambda: public_class.from_pem(public_pem), key=key_name)
+        runner.bench('key_id.cold', lambda: public_class(crypto_public_key).key_id(), key=key_name)
+        runner.bench('key_id.warm', public_key.key_id, key=key_name)
+        runner.bench('to_map', public_key.to_map, key=key_name)
+        runner.bench('marshal_json', public_key.marshal_json, key=key_name)
+        runner.bench('parse_public_key_jwk.uncached', lambda: key.parse_public_key_jwk(jwk, use_cache=False),
+                     key=key_name)
+        runner.bench('parse_public_key_jwk.cached', lambda: key.parse_public_key_jwk(jwk), key=key_name)
+
+
+def bench_json_signature(runner, keys, payload_sizes, signature_counts):
+    signing_keys = [keys[name] for name in sorted(keys)]
+    for size in payload_sizes:
+        content = make_content(size)
+        runner.bench('JSONSignature.from_map', lambda: jsonsign.JSONSignature.from_map(content), payload_size=size)
+
+        js = jsonsign.JSONSignature.from_map(content)
+        for key_name in ('RSA-2048', 'EC-P-256'):
+            private_key = keys[key_name]
+
+            def sign():
+                js.signatures = []
+                js.sign(private_key, timestamp=TIMESTAMP)
+
+            runner.bench('JSONSignature.sign', sign, payload_size=size, key=key_name)
+
+        for count in signature_counts:
+            js = jsonsign.JSONSignature.from_map(content)
+            for i in range(count):
+                js.sign(signing_keys[i % len(signing_keys)], timestamp=TIMESTAMP + i)
+            jws = js.jws()
+            params = {'payload_size': size, 'signatures': count}
+
+            runner.bench('JSONSignature.verify', js.verify, **params)
+            runner.bench('JSONSignature.jws', js.jws, **params)
+            runner.bench('JSONSignature.parse_jws', lambda: jsonsign.JSONSignature.parse_jws(jws), **params)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', '-o', help="write the JSON results to this file instead of stdout")
+    parser.add_argument('--quick', action='store_true', help="small payloads and signature counts only")
+    parser.add_argument('--min-time', type=float, default=0.05, help="seconds per sample (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=5, help="samples per benchmark (default: %(default)s)")
+    parser.add_argument('--payload-size', type=int, action='append', dest='payload_sizes',
+                        help="payload size in bytes, may be repeated")
+    parser.add_argument('--signatures', type=int, action='append', dest='signature_counts',
+                        help="signatures per manifest, may be repeated")
+    args = parser.parse_args(argv)
+
+    payload_sizes = args.payload_sizes or (QUICK_PAYLOAD_SIZES if args.quick else PAYLOAD_SIZES)
+    signature_counts = args.signature_counts or (QUICK_SIGNATURE_COUNTS if args.quick else SIGNATURE_COUNTS)
+
+    runner = Runner(args.min_time, args.repeat)
+    keys = generate_keys()
+    bench_keys(runner, keys)
+    bench_json_signature(runner, keys, payload_sizes, signature_counts)
+
+    report = {
+        'meta': {
+            'time': int(time.time()),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'cryptography': cryptography.__version__,
+        },
+        'results': runner.results,
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,23 @@
-from . import ec_key
-from . import rsa_key
+import importlib
+import sys
 
 __all__ = ['rsa_key', 'ec_key']
+
+# Submodules are imported on first attribute access, so importing the package
+# (or only `jsonsign`/`util`) does not pull in the cryptography backends.
+_SUBMODULES = frozenset((
+    'aio', 'batch', 'cache', 'certificates', 'cli', 'ec_key', 'hash', 'jsonsign', 'key', 'keyloader', 'keypool',
+    'keyset', 'keystore', 'kidindex', 'pipeline', 'policy', 'rsa_key', 'signpool', 'trace', 'util',
+))
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name in _SUBMODULES:
+            return importlib.import_module('.' + name, __name__)
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    def __dir__():
+        return sorted(set(globals()) | _SUBMODULES)
+else:
+    from . import ec_key  # noqa: F401
+    from . import rsa_key  # noqa: F401
@@ -0,0 +1,210 @@
+"""asyncio front-end for signing, verifying and parsing (Python 3 only).
+
+The CPU heavy work runs on an executor so the event loop keeps serving other
+requests. Cancelling an awaiting task releases its concurrency slot at once
+and drops the job if it has not started yet; a job already running on a
+worker thread finishes there and its result is discarded.
+"""
+import asyncio
+import collections
+import functools
+import weakref
+
+from . import hash as hash_
+from . import jsonsign
+from . import util
+
+__all__ = ['Runner', 'configure', 'sign', 'sign_many', 'verify', 'parse_jws', 'parse_jws_stream', 'verify_stream']
+
+
+class Runner(object):
+    def __init__(self, executor=None, max_concurrency=None):
+        """`executor` defaults to the loop's default executor; `max_concurrency`
+        bounds how many jobs of this runner are queued or running at once."""
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _get_semaphore(self):
+        # One per loop, a semaphore can only be awaited on the loop it is bound to
+        if not self.max_concurrency:
+            return None
+        loop = asyncio.get_event_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def run(self, func, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        call = functools.partial(func, *args, **kwargs)
+        semaphore = self._get_semaphore()
+        if semaphore is None:
+            return await loop.run_in_executor(self.executor, call)
+        async with semaphore:
+            return await loop.run_in_executor(self.executor, call)
+
+    async def sign(self, js, private_key, timestamp=None):
+        return await self.run(js.sign, private_key, timestamp=timestamp)
+
+    async def sign_many(self, js, private_keys, timestamp=None):
+        private_keys = list(private_keys)
+        protected = js.protected_header(timestamp=timestamp)
+        sign_parts = js.sign_parts(protected)
+
+        results = await asyncio.gather(*[
+            self.run(private_key.sign, sign_parts, hash_.HashID.SHA256) for private_key in private_keys
+        ])
+        for private_key, (sig_bytes, algorithm) in zip(private_keys, results):
+            js.append_signature(private_key, protected, sig_bytes, algorithm)
+        return list(results)
+
+    async def verify(self, js):
+        return await self.run(js.verify)
+
+    async def parse_jws(self, content):
+        return await self.run(jsonsign.JSONSignature.parse_jws, content)
+
+    async def parse_jws_stream(self, stream, chunk_size=util.READ_CHUNK_SIZE):
+        return await self.run(jsonsign.JSONSignature.parse_jws_stream, stream, chunk_size=chunk_size)
+
+    def verify_stream(self, documents, pipeline=None):
+        """Return an async iterator of a `pipeline.PipelineResult` per document
+        of an iterable or async iterable.
+
+        The stages of `pipeline` (a default `pipeline.Pipeline` if not given)
+        run on this runner's executor with its `max_in_flight` and `ordered`.
+        """
+        from libtrust import pipeline as pipeline_
+
+        pipeline = pipeline or pipeline_.Pipeline()
+        items = _Enumerate(documents, pipeline)
+        for func in pipeline.stages():
+            items = _Stage(self.executor, func, items, pipeline)
+        return _Results(items, pipeline)
+
+
+# The stream stages are async iterator classes rather than async generators,
+# which need Python 3.6
+
+class _Enumerate(object):
+    def __init__(self, documents, pipeline):
+        if hasattr(documents, '__aiter__'):
+            self._documents = documents.__aiter__()
+            self._async = True
+        else:
+            self._documents = iter(documents)
+            self._async = False
+        self._pipeline = pipeline
+        self._index = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._async:
+            document = await self._documents.__anext__()
+        else:
+            try:
+                document = next(self._documents)
+            except StopIteration:
+                raise StopAsyncIteration
+        item = self._pipeline.item(self._index, document)
+        self._index += 1
+        return item
+
+
+class _Stage(object):
+    def __init__(self, executor, func, items, pipeline):
+        self._executor = executor
+        self._func = func
+        self._items = items
+        self._ordered = pipeline.ordered
+        self._max_in_flight = pipeline.max_in_flight
+        self._pending = collections.deque() if pipeline.ordered else set()
+        self._ready = collections.deque()
+        self._exhausted = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._ready:
+            if not self._exhausted and len(self._pending) < self._max_in_flight:
+                try:
+                    item = await self._items.__anext__()
+                except StopAsyncIteration:
+                    self._exhausted = True
+                else:
+                    self._submit(item)
+                continue
+            if not self._pending:
+                raise StopAsyncIteration
+            self._ready.extend(await _take(self._pending, self._ordered))
+        return self._ready.popleft()
+
+    def _submit(self, item):
+        loop = asyncio.get_event_loop()
+        if item.error is None:
+            future = loop.run_in_executor(self._executor, self._func, item)
+        else:
+            future = loop.create_future()
+            future.set_result(item)
+        if self._ordered:
+            self._pending.append(future)
+        else:
+            self._pending.add(future)
+
+
+class _Results(object):
+    def __init__(self, items, pipeline):
+        self._items = items
+        self._pipeline = pipeline
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return self._pipeline.result(await self._items.__anext__())
+
+
+async def _take(pending, ordered):
+    if ordered:
+        return [await pending.popleft()]
+    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    pending.difference_update(done)
+    return [future.result() for future in done]
+
+
+default_runner = Runner()
+
+
+def configure(executor=None, max_concurrency=None):
+    """Replace the runner used by the module level functions."""
+    global default_runner
+    default_runner = Runner(executor=executor, max_concurrency=max_concurrency)
+    return default_runner
+
+
+async def sign(js, private_key, timestamp=None):
+    return await default_runner.sign(js, private_key, timestamp=timestamp)
+
+
+async def sign_many(js, private_keys, timestamp=None):
+    return await default_runner.sign_many(js, private_keys, timestamp=timestamp)
+
+
+async def verify(js):
+    return await default_runner.verify(js)
+
+
+async def parse_jws(content):
+    return await default_runner.parse_jws(content)
+
+
+async def parse_jws_stream(stream, chunk_size=util.READ_CHUNK_SIZE):
+    return await default_runner.parse_jws_stream(stream, chunk_size=chunk_size)
+
+
+def verify_stream(documents, pipeline=None):
+    return default_runner.verify_stream(documents, pipeline=pipeline)
@@ -0,0 +1,111 @@
+from __future__ import unicode_literals
+
+import collections
+import copy
+import multiprocessing
+
+from concurrent import futures
+
+import six
+
+from . import jsonsign
+from .key import parse_public_key_jwk
+
+__all__ = ['BatchResult', 'verify_many']
+
+BatchResult = collections.namedtuple('BatchResult', ('keys', 'error'))
+
+
+def default_workers():
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+
+def create_executor(max_workers=None, processes=False):
+    max_workers = max_workers or default_workers()
+    if processes:
+        return futures.ProcessPoolExecutor(max_workers=max_workers)
+    return futures.ThreadPoolExecutor(max_workers=max_workers)
+
+
+def map_ordered(func, items, max_workers=None, executor=None, processes=False, chunksize=1):
+    """Run `func` over `items` on a pool and return the results in input order.
+
+    When `executor` is given it is used as is and left running, otherwise a
+    pool of `max_workers` threads (or processes) is created for this call.
+    """
+    kwargs = {}
+    if processes or isinstance(executor, futures.ProcessPoolExecutor):
+        kwargs['chunksize'] = chunksize
+
+    if executor is not None:
+        return list(executor.map(func, items, **kwargs))
+
+    with create_executor(max_workers=max_workers, processes=processes) as pool:
+        return list(pool.map(func, items, **kwargs))
+
+
+def _load(item):
+    if isinstance(item, six.string_types + (six.binary_type,)):
+        return jsonsign.JSONSignature.parse_jws(item)
+    return item
+
+
+def _verify(item):
+    try:
+        return BatchResult(_load(item).verify(), None)
+    except Exception as e:
+        return BatchResult([], e)
+
+
+def _document(item):
+    if isinstance(item, six.string_types + (six.binary_type,)):
+        return item
+    # `jws()` sorts the signatures in place, serialize a copy so `item` is left as it is
+    js = copy.copy(item)
+    js.signatures = list(item.signatures)
+    return js.jws()
+
+
+def _verify_jws(content):
+    # Runs in a worker process: key objects can not cross the process
+    # boundary, so the verified keys are sent back as JWK maps.
+    result = _verify(content)
+    return BatchResult([k.to_map() for k in result.keys], result.error)
+
+
+def verify_many(items, max_workers=None, executor=None, processes=False, chunksize=16):
+    """Verify every signature of many signed manifests on a worker pool.
+
+    `items` may mix parsed `JSONSignature` objects and JWS documents. The
+    returned list holds one `BatchResult` per item, in input order: `keys`
+    is what `JSONSignature.verify` returned and `error` is the exception it
+    raised (in which case `keys` is empty).
+
+    With `processes=True` items are shipped to the workers as JWS text and
+    parsed there. An object that can not be serialized, such as one without
+    signatures, is verified in this process instead.
+    """
+    if not (processes or isinstance(executor, futures.ProcessPoolExecutor)):
+        return map_ordered(_verify, items, max_workers=max_workers, executor=executor)
+
+    results = []
+    documents = []
+    for item in items:
+        try:
+            documents.append(_document(item))
+        except Exception:
+            results.append(_verify(item))
+        else:
+            # Filled in below once the workers are done
+            results.append(None)
+
+    verified = iter(map_ordered(_verify_jws, documents, max_workers=max_workers, executor=executor,
+                                processes=True, chunksize=chunksize))
+    for i, result in enumerate(results):
+        if result is None:
+            result = next(verified)
+            results[i] = BatchResult([parse_public_key_jwk(jwk) for jwk in result.keys], result.error)
+    return results
@@ -0,0 +1,167 @@
+from __future__ import unicode_literals
+
+import collections
+import hashlib
+import struct
+import threading
+import time
+
+import six
+
+__all__ = ['CacheInfo', 'LRUCache', 'VerifyCache']
+
+CacheInfo = collections.namedtuple('CacheInfo', ('hits', 'misses', 'maxsize', 'currsize'))
+
+# A cached verification: the verified public key or the `(type, args)` of the error it failed with, and when it expires
+VerifyResult = collections.namedtuple('VerifyResult', ('public_key', 'error', 'expires'))
+
+
+class LRUCache(object):
+    """A small thread-safe mapping that evicts the least recently used entry.
+
+    `maxsize=None` never evicts and `maxsize=0` disables caching entirely.
+    """
+
+    def __init__(self, maxsize=128):
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be None or >= 0")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.maxsize == 0:
+            return value
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return value
+
+    def get_or_create(self, key, factory):
+        """Return the cached value for `key`, calling `factory()` on a miss.
+
+        The factory runs outside the lock, so two threads missing on the same
+        key may both build a value; the last one stored wins.
+        """
+        marker = self._data
+        value = self.get(key, marker)
+        if value is marker:
+            value = self.put(key, factory())
+        return value
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def resize(self, maxsize):
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be None or >= 0")
+        with self._lock:
+            self.maxsize = maxsize
+            while maxsize is not None and len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+
+class VerifyCache(object):
+    """Remember signature verification results for `JSONSignature.verify(cache=...)`.
+
+    Results are keyed by a SHA-256 digest of the protected header, payload,
+    signature, key id and algorithm. A successful verification is kept for
+    `ttl` seconds and a failed one for `negative_ttl` seconds, at most
+    `maxsize` results are kept.
+    """
+
+    def __init__(self, maxsize=4096, ttl=300, negative_ttl=5, clock=time.time):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._results = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._results)
+
+    @staticmethod
+    def key(protected, payload, signature, kid, alg):
+        hasher = hashlib.sha256()
+        for part in (protected, payload, signature, kid, alg):
+            if isinstance(part, six.text_type):
+                part = part.encode('utf-8')
+            hasher.update(struct.pack(str('>Q'), len(part)))
+            hasher.update(part)
+        return hasher.digest()
+
+    def get(self, key):
+        """Return the unexpired `VerifyResult` for `key`, or `None`."""
+        result = self._results.get(key)
+        if result is not None and result.expires <= self.clock():
+            self._results.discard(key)
+            result = None
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def put(self, key, public_key):
+        self._results.put(key, VerifyResult(public_key, None, self.clock() + self.ttl))
+
+    def put_error(self, key, error):
+        # Not the exception itself: it would be shared between threads and
+        # its traceback would grow every time it is raised again
+        if self.negative_ttl > 0:
+            self._results.put(key, VerifyResult(None, (type(error), error.args), self.clock() + self.negative_ttl))
+
+    @staticmethod
+    def error(result):
+        """A new instance of the error a cached `VerifyResult` failed with, or `None`."""
+        if result.error is None:
+            return None
+        error_type, args = result.error
+        return error_type(*args)
+
+    def clear(self):
+        self._results.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return CacheInfo(hits, misses, self._results.maxsize, len(self._results))
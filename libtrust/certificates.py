@@ -0,0 +1,219 @@
+from __future__ import unicode_literals
+
+import base64
+import calendar
+import collections
+import time
+
+from cryptography import x509
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from . import cache
+from . import key
+
+__all__ = [
+    'CertificateError', 'CertPool', 'ChainVerifier', 'parse_chain_certificate', 'encode_chain_certificate',
+    'certificate_public_key',
+]
+
+# A parsed certificate and its SHA-256 fingerprint
+ParsedCertificate = collections.namedtuple('ParsedCertificate', ('certificate', 'fingerprint'))
+
+# Parsed `x5c` entries shared by every verifier, keyed by their base64 text
+certificate_cache = cache.LRUCache(maxsize=1024)
+
+# Leaf certificate keys as libtrust keys, keyed by the certificate fingerprint
+public_key_cache = cache.LRUCache(maxsize=1024)
+
+
+class CertificateError(Exception):
+    pass
+
+
+def _parse_certificate(certificate):
+    return ParsedCertificate(certificate, certificate.fingerprint(hashes.SHA256()))
+
+
+def parse_chain_certificate(cert_b64):
+    """Parse one base64 (standard alphabet) DER entry of a `x5c` chain."""
+    if isinstance(cert_b64, bytes):
+        cert_b64 = cert_b64.decode('ascii')
+
+    def parse():
+        try:
+            der_bytes = base64.b64decode(cert_b64.encode('ascii'))
+            certificate = x509.load_der_x509_certificate(der_bytes, default_backend())
+        except Exception as e:
+            raise CertificateError("invalid certificate in chain: {}".format(e))
+        return _parse_certificate(certificate)
+
+    return certificate_cache.get_or_create(cert_b64, parse)
+
+
+def certificate_public_key(cert_b64):
+    """The public key of a `x5c` entry as a libtrust key, for the leaf certificate.
+
+    Only the leaf's key signs the JWS, so certificates higher in the chain
+    may use key types libtrust can not verify with.
+    """
+    parsed = parse_chain_certificate(cert_b64)
+
+    def convert():
+        try:
+            return key.from_crypto_public_key(parsed.certificate.public_key())
+        except NotImplementedError as e:
+            raise CertificateError("unsupported certificate {}: {}".format(parsed.certificate.subject, e))
+
+    return public_key_cache.get_or_create(parsed.fingerprint, convert)
+
+
+def encode_chain_certificate(certificate):
+    der_bytes = certificate.public_bytes(serialization.Encoding.DER)
+    return base64.b64encode(der_bytes).decode('ascii')
+
+
+def _timestamp(date):
+    return calendar.timegm(date.utctimetuple())
+
+
+def _check_validity(certificate, now):
+    if not _timestamp(certificate.not_valid_before) <= now <= _timestamp(certificate.not_valid_after):
+        raise CertificateError("certificate {} has expired or is not yet valid".format(certificate.subject))
+
+
+def _check_signature(certificate, issuer):
+    if certificate.issuer != issuer.subject:
+        raise CertificateError("certificate {} is not issued by {}".format(certificate.subject, issuer.subject))
+
+    public_key = issuer.public_key()
+    try:
+        if isinstance(public_key, rsa.RSAPublicKey):
+            public_key.verify(certificate.signature, certificate.tbs_certificate_bytes, padding.PKCS1v15(),
+                              certificate.signature_hash_algorithm)
+        elif isinstance(public_key, ec.EllipticCurvePublicKey):
+            public_key.verify(certificate.signature, certificate.tbs_certificate_bytes,
+                              ec.ECDSA(certificate.signature_hash_algorithm))
+        else:
+            raise CertificateError("unsupported issuer key type {}".format(type(public_key).__name__))
+    except CertificateError:
+        raise
+    except Exception:
+        raise CertificateError("invalid signature on certificate {}".format(certificate.subject))
+
+
+def _check_ca(certificate, intermediates_below):
+    try:
+        constraints = certificate.extensions.get_extension_for_class(x509.BasicConstraints).value
+    except x509.ExtensionNotFound:
+        raise CertificateError("certificate {} is not a CA".format(certificate.subject))
+    if not constraints.ca:
+        raise CertificateError("certificate {} is not a CA".format(certificate.subject))
+    if constraints.path_length is not None and intermediates_below > constraints.path_length:
+        raise CertificateError("path length constraint of {} exceeded".format(certificate.subject))
+
+    try:
+        usage = certificate.extensions.get_extension_for_class(x509.KeyUsage).value
+    except x509.ExtensionNotFound:
+        return
+    if not usage.key_cert_sign:
+        raise CertificateError("certificate {} may not sign certificates".format(certificate.subject))
+
+
+class CertPool(object):
+    """A set of trusted root certificates."""
+
+    def __init__(self, certificates=()):
+        self._by_subject = {}
+        self._fingerprints = set()
+        for certificate in certificates:
+            self.add(certificate)
+
+    @classmethod
+    def from_pem(cls, pem_data):
+        """Load every certificate of a PEM bundle."""
+        pool = cls()
+        marker = b'-----END CERTIFICATE-----'
+        for block in pem_data.split(marker)[:-1]:
+            pool.add(x509.load_pem_x509_certificate(block + marker, default_backend()))
+        return pool
+
+    def add(self, certificate):
+        fingerprint = certificate.fingerprint(hashes.SHA256())
+        if fingerprint in self._fingerprints:
+            return
+        self._fingerprints.add(fingerprint)
+        self._by_subject.setdefault(certificate.subject, []).append(certificate)
+
+    def __len__(self):
+        return len(self._fingerprints)
+
+    def __contains__(self, fingerprint):
+        return fingerprint in self._fingerprints
+
+    def issuers_of(self, certificate):
+        return list(self._by_subject.get(certificate.issuer, ()))
+
+
+class ChainVerifier(object):
+    """Validate `x5c` chains against a pool of trusted roots.
+
+    Certificates are parsed once and successful validations are cached by
+    the fingerprints of the chain for as long as every certificate in it is valid,
+    so a chain shared by many manifests is only path-validated once.
+    """
+
+    def __init__(self, roots, cache_size=1024, clock=time.time):
+        self.roots = roots
+        self.clock = clock
+        self.chain_cache = cache.LRUCache(maxsize=cache_size)
+
+    def verify(self, chain):
+        """Validate `chain` (leaf first) and return its certificates followed by the trusted root."""
+        if not chain:
+            raise CertificateError("empty certificate chain")
+
+        parsed = [parse_chain_certificate(cert_b64) for cert_b64 in chain]
+        cache_key = tuple(p.fingerprint for p in parsed)
+        now = self.clock()
+
+        cached = self.chain_cache.get(cache_key)
+        if cached is not None:
+            valid_from, valid_until, verified = cached
+            if valid_from <= now <= valid_until:
+                return list(verified)
+            self.chain_cache.discard(cache_key)
+
+        verified = self._validate([p.certificate for p in parsed], cache_key, now)
+        valid_from = max(_timestamp(certificate.not_valid_before) for certificate in verified)
+        valid_until = min(_timestamp(certificate.not_valid_after) for certificate in verified)
+        self.chain_cache.put(cache_key, (valid_from, valid_until, tuple(verified)))
+        return verified
+
+    def _validate(self, certificates, fingerprints, now):
+        for certificate in certificates:
+            _check_validity(certificate, now)
+
+        for i, (certificate, issuer) in enumerate(zip(certificates, certificates[1:])):
+            _check_ca(issuer, i)
+            _check_signature(certificate, issuer)
+
+        last = certificates[-1]
+        if fingerprints[-1] in self.roots:
+            return list(certificates)
+
+        intermediates = len(certificates) - 1
+        for root in self.roots.issuers_of(last):
+            try:
+                _check_validity(root, now)
+                _check_ca(root, intermediates)
+                _check_signature(last, root)
+            except CertificateError:
+                continue
+            return list(certificates) + [root]
+
+        raise CertificateError("certificate signed by unknown authority")
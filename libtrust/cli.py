@@ -0,0 +1,236 @@
+"""Sign and verify manifests in bulk.
+
+    libtrust sign --key private.pem manifests/*.json > signed.ndjson
+    libtrust verify --jobs 8 signed/ > results.ndjson
+    cat signed.ndjson | libtrust verify -
+
+Inputs are files, directories (walked recursively) and glob patterns; `-` or
+no input at all reads one document per line from stdin. One JSON line is
+written per input, in input order, with the time spent on it.
+"""
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import collections
+import glob
+import io
+import json
+import os
+import sys
+import timeit
+
+from concurrent import futures
+
+from . import batch
+from . import jsonsign
+from . import key
+
+__all__ = ['main']
+
+# Private keys loaded by the workers, by path and passphrase
+_private_keys = {}
+
+
+def _private_key(path, passphrase):
+    cache_key = (path, passphrase)
+    if cache_key not in _private_keys:
+        with open(path, 'rb') as f:
+            _private_keys[cache_key] = key.load_private_key_pem(f.read(), passphrase)
+    return _private_keys[cache_key]
+
+
+def _read(path, text):
+    if text is not None:
+        return text
+    with io.open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _error(e):
+    return '{}: {}'.format(type(e).__name__, e)
+
+
+def output_path(output_dir, path):
+    """Where `--output-dir` writes the signed `path`.
+
+    Paths under the current directory keep their relative path, others
+    only their file name.
+    """
+    relative = os.path.relpath(path)
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep) or os.path.isabs(relative):
+        relative = os.path.basename(path)
+    return os.path.join(output_dir, relative)
+
+
+def _sign_tasks(inputs, key_path, passphrase, output_dir):
+    # The first input mapped to each output path, a later one fails instead of overwriting it
+    outputs = {}
+    for item in inputs:
+        source, path, _ = item
+        output = conflict = None
+        if output_dir and path is not None:
+            output = output_path(output_dir, path)
+            conflict = outputs.setdefault(output, source)
+            if conflict == source:
+                conflict = None
+        yield item, key_path, passphrase, output, conflict
+
+
+def _write(output, jws):
+    directory = os.path.dirname(output)
+    if directory and not os.path.isdir(directory):
+        try:
+            os.makedirs(directory)
+        except OSError:
+            # Created by another worker in the meantime
+            if not os.path.isdir(directory):
+                raise
+    with io.open(output, 'w', encoding='utf-8') as f:
+        f.write(jws)
+
+
+def _sign(task):
+    (source, path, text), key_path, passphrase, output, conflict = task
+    started = timeit.default_timer()
+    result = {'source': source}
+    try:
+        if conflict is not None:
+            raise ValueError("{} is already the output of {}".format(output, conflict))
+        private_key = _private_key(key_path, passphrase)
+        js = jsonsign.JSONSignature.new_json_signature(_read(path, text))
+        js.sign(private_key)
+        jws = js.jws()
+        if output is not None:
+            _write(output, jws)
+            result['output'] = output
+        else:
+            result['jws'] = jws
+        result.update(ok=True, kid=private_key.key_id())
+    except Exception as e:
+        result.update(ok=False, error=_error(e))
+    result['elapsed_ms'] = round((timeit.default_timer() - started) * 1000, 3)
+    return result
+
+
+def _verify(task):
+    source, path, text = task
+    started = timeit.default_timer()
+    result = {'source': source}
+    try:
+        if text is not None:
+            js = jsonsign.JSONSignature.parse_jws(text)
+        else:
+            with open(path, 'rb') as f:
+                js = jsonsign.JSONSignature.parse_jws_stream(f)
+        result.update(ok=True, keys=[public_key.key_id() for public_key in js.verify()])
+    except Exception as e:
+        result.update(ok=False, error=_error(e))
+    result['elapsed_ms'] = round((timeit.default_timer() - started) * 1000, 3)
+    return result
+
+
+def _is_pattern(name):
+    return any(c in name for c in '*?[')
+
+
+def iter_inputs(inputs, stdin):
+    """Yield `(source, path, text)` for every input document."""
+    for name in inputs or ['-']:
+        if name == '-':
+            for lineno, line in enumerate(stdin, 1):
+                line = line.strip()
+                if line:
+                    yield '-:{}'.format(lineno), None, line
+            continue
+
+        paths = sorted(glob.glob(name)) if _is_pattern(name) else [name]
+        for path in paths:
+            if not os.path.isdir(path):
+                yield path, path, None
+                continue
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for filename in sorted(files):
+                    file_path = os.path.join(root, filename)
+                    yield file_path, file_path, None
+
+
+def run(func, tasks, jobs):
+    """Run `func` over `tasks` on `jobs` processes, yielding results in order.
+
+    At most `4 * jobs` tasks are in flight, so inputs are read as the
+    results are written rather than all up front.
+    """
+    if jobs <= 1:
+        for task in tasks:
+            yield func(task)
+        return
+
+    with futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = collections.deque()
+        for task in tasks:
+            pending.append(executor.submit(func, task))
+            if len(pending) >= 4 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(prog='libtrust', description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('inputs', nargs='*', help="files, directories or glob patterns, '-' for NDJSON on stdin")
+    common.add_argument('--jobs', '-j', type=int, default=batch.default_workers(),
+                        help="worker processes, 1 runs inline (default: %(default)s)")
+
+    sign = subparsers.add_parser('sign', parents=[common], help="sign manifests with a private key")
+    sign.add_argument('--key', '-k', required=True, help="PEM encoded RSA or EC private key")
+    sign.add_argument('--passphrase-env', metavar='NAME', help="read the key passphrase from this environment variable")
+    sign.add_argument('--output-dir', '-o', help="write signed files here instead of into the result lines")
+
+    subparsers.add_parser('verify', parents=[common], help="verify signed manifests")
+    return parser
+
+
+def main(argv=None, stdin=None, stdout=None):
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+
+    for name in args.inputs:
+        if _is_pattern(name) and not glob.glob(name):
+            parser.error("no files match {}".format(name))
+
+    inputs = iter_inputs(args.inputs, stdin)
+    if args.command == 'sign':
+        passphrase = None
+        if args.passphrase_env:
+            if args.passphrase_env not in os.environ:
+                parser.error("environment variable {} is not set".format(args.passphrase_env))
+            passphrase = os.environ[args.passphrase_env].encode('utf-8')
+        key_path = os.path.abspath(args.key)
+        tasks = _sign_tasks(inputs, key_path, passphrase, args.output_dir)
+        func = _sign
+    else:
+        tasks = inputs
+        func = _verify
+
+    started = timeit.default_timer()
+    counts = collections.Counter()
+    for result in run(func, tasks, args.jobs):
+        counts[result['ok']] += 1
+        stdout.write(json.dumps(result, sort_keys=True) + '\n')
+        stdout.flush()
+
+    print('{} ok, {} failed in {:.3f}s'.format(counts[True], counts[False], timeit.default_timer() - started),
+          file=sys.stderr)
+    return 1 if counts[False] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,7 +3,6 @@ from __future__ import unicode_literals
 import copy
 import enum
 
-from cryptography import utils as cry_utils
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives import serialization
@@ -12,14 +11,43 @@ from cryptography.hazmat.primitives.asymmetric import utils as asy_utils
 
 from . import hash as hash_
 from . import key
+from . import trace
 from . import util
 
-__all__ = ['ECPublicKey', 'ECPrivateKey']
+__all__ = ['ECPublicKey', 'ECPrivateKey', 'register_curve', 'unregister_curve', 'generate_private_key']
 
 PublicKey = key.PublicKey
 PrivateKey = key.PrivateKey
 
 
+class Curve(object):
+    """A `crv` registered with `register_curve`."""
+
+    def __init__(self, name, crypto_curve, signature_algorithm, bit_size):
+        self.value = name
+        self._crypto_curve = crypto_curve
+        self._signature_algorithm = signature_algorithm
+        self._bit_size = bit_size
+        self._octet_length = (bit_size + 7) >> 3
+
+    def crypto_curve(self):
+        return self._crypto_curve
+
+    def signature_algorithm(self):
+        return self._signature_algorithm
+
+    def bit_size(self):
+        return self._bit_size
+
+    def octet_length(self):
+        return self._octet_length
+
+
+# Registered curves by `crv` and by the `cryptography` curve name
+_curves = {}
+_curves_by_common_name = {}
+
+
 class Curves(enum.Enum):
     P256 = 'P-256'
     P384 = 'P-384'
@@ -27,35 +55,63 @@ class Curves(enum.Enum):
 
     @classmethod
     def from_common_name(cls, common_name):
-        return {
-            ec.SECP256R1.name: cls.P256,
-            ec.SECP384R1.name: cls.P384,
-            ec.SECP521R1.name: cls.P521
-        }[common_name]
+        return curve_by_name(_curves_by_common_name[common_name].value)
 
     def crypto_curve(self):
-        return {
-            self.P256: ec.SECP256R1,
-            self.P384: ec.SECP384R1,
-            self.P521: ec.SECP521R1
-        }[self]
+        return _curves[self.value].crypto_curve()
 
     def signature_algorithm(self):
-        return {
-            self.P256: hash_.ES256,
-            self.P384: hash_.ES384,
-            self.P521: hash_.ES521
-        }[self]
+        return _curves[self.value].signature_algorithm()
 
     def bit_size(self):
-        return {
-            self.P256: 256,
-            self.P384: 384,
-            self.P521: 521
-        }[self]
+        return _curves[self.value].bit_size()
+
+    def octet_length(self):
+        return _curves[self.value].octet_length()
+
+
+def register_curve(name, crypto_curve, signature_algorithm, bit_size):
+    """Support EC keys on `crypto_curve` (a `cryptography` curve class) as `crv` `name`.
+
+    `signature_algorithm` is registered with `hash.register_signature_algorithm` too.
+    """
+    curve = Curve(name, crypto_curve, signature_algorithm, bit_size)
+    hash_.register_signature_algorithm(signature_algorithm)
+    _curves[name] = curve
+    _curves_by_common_name[crypto_curve.name] = curve
+    return curve
+
+
+def unregister_curve(name):
+    """Undo `register_curve`, the built-in `Curves` can not be removed."""
+    if name in Curves._value2member_map_:
+        raise ValueError("{!r} is a built-in curve".format(name))
+    curve = _curves.pop(name, None)
+    if curve is not None:
+        _curves_by_common_name.pop(curve.crypto_curve().name, None)
+        hash_.unregister_signature_algorithm(curve.signature_algorithm().header_param())
+    return curve
+
+
+def curve_by_name(name):
+    """Return the `Curves` member or registered `Curve` for a `crv`."""
+    member = Curves._value2member_map_.get(name)
+    if member is not None:
+        return member
+    try:
+        return _curves[name]
+    except KeyError:
+        raise ValueError("{!r} is not a supported curve".format(name))
+
+
+register_curve(Curves.P256.value, ec.SECP256R1, hash_.ES256, 256)
+register_curve(Curves.P384.value, ec.SECP384R1, hash_.ES384, 384)
+register_curve(Curves.P521.value, ec.SECP521R1, hash_.ES521, 521)
 
 
 class ECKey(object):
+    __slots__ = ('_key', '_fingerprint', '_key_id')
+
     def key_type(self):
         return 'EC'
 
@@ -66,20 +122,32 @@ class ECKey(object):
     @key.setter
     def key(self, value):
         self._key = value
-        self.numbers = self._numbers()
+        self._fingerprint = None
+        self._key_id = None
+
+    @property
+    def numbers(self):
+        """The key's `cryptography` numbers, computed on every access."""
+        return self._numbers()
 
     def _numbers(self):
         raise NotImplementedError()
 
+    def fingerprint(self):
+        if self._fingerprint is None:
+            der_bytes = self.crypto_public_key().public_bytes(
+                serialization.Encoding.DER,
+                serialization.PublicFormat.SubjectPublicKeyInfo
+            )
+            hasher = hashes.Hash(hashes.SHA256(), default_backend())
+            hasher.update(der_bytes)
+            self._fingerprint = hasher.finalize()
+        return self._fingerprint
+
     def key_id(self):
-        der_bytes = self.crypto_public_key().public_bytes(
-            serialization.Encoding.DER,
-            serialization.PublicFormat.SubjectPublicKeyInfo
-        )
-        hasher = hashes.Hash(hashes.SHA256(), default_backend())
-        hasher.update(der_bytes)
-        hash_bytes = hasher.finalize()
-        return util.key_id_encode(hash_bytes[:30])
+        if self._key_id is None:
+            self._key_id = util.key_id_encode(self.fingerprint()[:30])
+        return self._key_id
 
     @property
     def curve_name(self):
@@ -94,10 +162,21 @@ class ECKey(object):
         return self.curve.signature_algorithm()
 
     def __eq__(self, other):
-        return self.crypto_public_key().public_numbers() == other.crypto_public_key().public_numbers()
+        if not isinstance(other, PublicKey):
+            return NotImplemented
+        return self.fingerprint() == other.fingerprint()
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return hash(self.fingerprint())
 
 
 class ECPublicKey(ECKey, PublicKey):
+    __slots__ = ()
+
     def __init__(self, key):
         self.key = key
 
@@ -122,14 +201,15 @@ class ECPublicKey(ECKey, PublicKey):
         return copy.copy(self.key)
 
     def to_map(self):
+        numbers = self.numbers
         jwk = {
             'kty': self.key_type(),
             'kid': self.key_id(),
             'crv': self.curve_name,
         }
-        x_bytes = cry_utils.int_to_bytes(self.numbers.x)
-        y_bytes = cry_utils.int_to_bytes(self.numbers.y)
-        octet_length = (self.curve.bit_size() + 7) >> 3
+        x_bytes = util.int_to_bytes(numbers.x)
+        y_bytes = util.int_to_bytes(numbers.y)
+        octet_length = self.curve.octet_length()
 
         x_bytes = b'\x00' * (octet_length - len(x_bytes)) + x_bytes
         y_bytes = b'\x00' * (octet_length - len(y_bytes)) + y_bytes
@@ -141,29 +221,32 @@ class ECPublicKey(ECKey, PublicKey):
     def verify(self, buffer, alg, signature):
         sig_length = len(signature)
         r_bytes, s_bytes = signature[:sig_length // 2], signature[sig_length // 2:]
-        r, s = cry_utils.int_from_bytes(r_bytes, 'big'), cry_utils.int_from_bytes(s_bytes, 'big')
+        r, s = util.int_from_bytes(r_bytes), util.int_from_bytes(s_bytes)
 
         signature = asy_utils.encode_dss_signature(r, s)
         sig_alg = self.signature_algorithm
-        verifier = self.key.verifier(
-            signature,
-            ec.ECDSA(sig_alg.hasher())
-        )
-        while True:
-            d = buffer.read(1024).encode()
-            if not d:
-                break
-            verifier.update(d)
+        started = trace.start()
+        digest = util.digest_buffer(buffer, sig_alg.hasher())
+        trace.finish(started, trace.DIGEST, self, alg, buffer)
 
+        started = trace.start()
         try:
-            verifier.verify()
+            self.key.verify(
+                signature,
+                digest,
+                ec.ECDSA(asy_utils.Prehashed(sig_alg.hasher()))
+            )
         except Exception as e:
             raise e
+        finally:
+            trace.finish(started, trace.CRYPTO_VERIFY, self, alg)
 
         return True
 
 
 class ECPrivateKey(ECKey, PrivateKey):
+    __slots__ = ()
+
     def __init__(self, key):
         self.key = key
 
@@ -196,9 +279,10 @@ class ECPrivateKey(ECKey, PrivateKey):
         return self.key.public_key()
 
     def to_map(self):
+        numbers = self.numbers
         public_key_map = self.public_key().to_map()
-        d_bytes = cry_utils.int_to_bytes(self.numbers.private_value)
-        octet_length = (len(cry_utils.int_to_bytes(self.numbers.private_value - 1)) + 7) >> 3
+        d_bytes = util.int_to_bytes(numbers.private_value)
+        octet_length = (len(util.int_to_bytes(numbers.private_value - 1)) + 7) >> 3
 
         d_bytes = b'\x00' * (octet_length - len(d_bytes)) + d_bytes
         private_key_map = {
@@ -210,19 +294,19 @@ class ECPrivateKey(ECKey, PrivateKey):
 
     def sign(self, buffer, hash_id):
         sig_alg = self.signature_algorithm
-        signer = self.key.signer(
-            ec.ECDSA(sig_alg.hasher())
-        )
-        while True:
-            d = buffer.read(1024).encode()
-            if not d:
-                break
-            signer.update(d)
-
-        r, s = asy_utils.decode_dss_signature(signer.finalize())
-        r_bytes = cry_utils.int_to_bytes(r)
-        s_bytes = cry_utils.int_to_bytes(s)
-        octet_length = (self.public_key().curve.bit_size() + 7) >> 3
+        started = trace.start()
+        digest = util.digest_buffer(buffer, sig_alg.hasher())
+        trace.finish(started, trace.DIGEST, self, sig_alg.header_param(), buffer)
+
+        started = trace.start()
+        r, s = asy_utils.decode_dss_signature(self.key.sign(
+            digest,
+            ec.ECDSA(asy_utils.Prehashed(sig_alg.hasher()))
+        ))
+        trace.finish(started, trace.CRYPTO_SIGN, self, sig_alg.header_param())
+        r_bytes = util.int_to_bytes(r)
+        s_bytes = util.int_to_bytes(s)
+        octet_length = self.curve.octet_length()
 
         r_bytes = b'\x00' * (octet_length - len(r_bytes)) + r_bytes
         s_bytes = b'\x00' * (octet_length - len(s_bytes)) + s_bytes
@@ -232,13 +316,21 @@ class ECPrivateKey(ECKey, PrivateKey):
 
 def ec_public_key_from_map(jwk):
     crv_name = jwk['crv']
-    curve = Curves(crv_name)
+    curve = curve_by_name(crv_name)
 
     crypto_curve = curve.crypto_curve()
 
-    xb64url = jwk['x'].encode('utf-8')
-    yb64url = jwk['y'].encode('utf-8')
-    x = util.parse_ec_coordinate(xb64url, curve)
-    y = util.parse_ec_coordinate(yb64url, curve)
+    x = util.parse_ec_coordinate(jwk['x'], curve)
+    y = util.parse_ec_coordinate(jwk['y'], curve)
     public_key = ec.EllipticCurvePublicNumbers(x, y, crypto_curve()).public_key(default_backend())
     return ECPublicKey(public_key)
+
+
+def generate_private_key(curve=Curves.P256):
+    """Generate a new EC private key on `curve`, a curve or its `crv` name."""
+    curve = curve_by_name(getattr(curve, 'value', curve))
+    private_key = ec.generate_private_key(curve.crypto_curve()(), default_backend())
+    return ECPrivateKey(private_key)
+
+
+key.register_key_type('EC', ec_public_key_from_map, ('crv', 'x', 'y'))
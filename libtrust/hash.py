@@ -1,7 +1,11 @@
 from __future__ import unicode_literals
 
 import enum
-from cryptography.hazmat.primitives import hashes
+
+__all__ = [
+    'HashID', 'SignatureAlgorithm', 'register_signature_algorithm', 'unregister_signature_algorithm',
+    'signature_algorithm_by_name',
+]
 
 
 class HashID(enum.Enum):
@@ -14,14 +18,11 @@ class HashID(enum.Enum):
 
     @property
     def hash_func(self):
-        return {
-            self.MD5: hashes.MD5,
-            self.SHA1: hashes.SHA1,
-            self.SHA224: hashes.SHA224,
-            self.SHA256: hashes.SHA256,
-            self.SHA384: hashes.SHA384,
-            self.SHA512: hashes.SHA512,
-        }[self]
+        try:
+            return _hash_funcs[self]
+        except KeyError:
+            _load_hash_funcs()
+            return _hash_funcs[self]
 
     @classmethod
     def iterkeys(cls):
@@ -29,10 +30,40 @@ class HashID(enum.Enum):
             yield k
 
 
+# `HashID` to `cryptography` hash class, filled on first use so importing this module stays cheap
+_hash_funcs = {}
+
+
+def _load_hash_funcs():
+    from cryptography.hazmat.primitives import hashes
+
+    _hash_funcs.update({
+        HashID.MD5: hashes.MD5,
+        HashID.SHA1: hashes.SHA1,
+        HashID.SHA224: hashes.SHA224,
+        HashID.SHA256: hashes.SHA256,
+        HashID.SHA384: hashes.SHA384,
+        HashID.SHA512: hashes.SHA512,
+    })
+
+
+def pkcs1v15():
+    from cryptography.hazmat.primitives.asymmetric import padding
+
+    return padding.PKCS1v15()
+
+
 class SignatureAlgorithm(object):
-    def __init__(self, alg_header_param, hash_id):
+    """A JWS `alg`: the hash to digest with and, for RSA, the padding to sign with.
+
+    `padding_factory` is called with no arguments for every RSA operation.
+    """
+
+    def __init__(self, alg_header_param, hash_id, key_type=None, padding_factory=None):
         self.alg_header_param = alg_header_param
         self.hash_id = hash_id
+        self.key_type = key_type
+        self.padding_factory = padding_factory
 
     def header_param(self):
         return self.alg_header_param
@@ -40,29 +71,55 @@ class SignatureAlgorithm(object):
     def hasher(self):
         return self.hash_id.hash_func()
 
+    def padding(self):
+        return (self.padding_factory or pkcs1v15)()
+
+
+# Every known `alg`, by header parameter
+_signature_algorithms = {}
+
+# RSA algorithm to sign with for a requested `HashID`
+_rsa_by_hash_id = {}
+
+
+def register_signature_algorithm(sig_alg, default_for_hash=False):
+    """Make `sig_alg` available to verifiers by its header parameter.
+
+    With `default_for_hash`, RSA keys also sign with it when asked for its hash.
+    """
+    _signature_algorithms[sig_alg.header_param()] = sig_alg
+    if default_for_hash and sig_alg.key_type == 'RSA':
+        _rsa_by_hash_id[sig_alg.hash_id] = sig_alg
+    return sig_alg
+
+
+def unregister_signature_algorithm(alg):
+    """Undo `register_signature_algorithm` for the header parameter `alg`."""
+    sig_alg = _signature_algorithms.pop(alg, None)
+    if sig_alg is not None and _rsa_by_hash_id.get(sig_alg.hash_id) is sig_alg:
+        del _rsa_by_hash_id[sig_alg.hash_id]
+    return sig_alg
+
+
+def signature_algorithm_by_name(alg, key_type=None):
+    sig_alg = _signature_algorithms.get(alg)
+    if sig_alg is None or (key_type is not None and sig_alg.key_type != key_type):
+        message = "{} Digital Signature Algorithm {} not supported".format(key_type or '', alg)
+        raise NotImplementedError(message.lstrip())
+    return sig_alg
+
 
-RS256 = SignatureAlgorithm('RS256', HashID.SHA256)
-RS384 = SignatureAlgorithm('RS384', HashID.SHA384)
-RS512 = SignatureAlgorithm('RS512', HashID.SHA512)
-ES256 = SignatureAlgorithm('ES256', HashID.SHA256)
-ES384 = SignatureAlgorithm('ES384', HashID.SHA384)
-ES521 = SignatureAlgorithm('ES521', HashID.SHA512)
+RS256 = register_signature_algorithm(SignatureAlgorithm('RS256', HashID.SHA256, 'RSA', pkcs1v15), True)
+RS384 = register_signature_algorithm(SignatureAlgorithm('RS384', HashID.SHA384, 'RSA', pkcs1v15), True)
+RS512 = register_signature_algorithm(SignatureAlgorithm('RS512', HashID.SHA512, 'RSA', pkcs1v15), True)
+ES256 = register_signature_algorithm(SignatureAlgorithm('ES256', HashID.SHA256, 'EC'))
+ES384 = register_signature_algorithm(SignatureAlgorithm('ES384', HashID.SHA384, 'EC'))
+ES521 = register_signature_algorithm(SignatureAlgorithm('ES521', HashID.SHA512, 'EC'))
 
 
 def rsa_signature_algorithm_by_name(alg):
-    signature_algorithms = {
-        'RS256': RS256,
-        'RS384': RS384,
-        'RS512': RS512
-    }
-    if alg not in signature_algorithms:
-        raise NotImplementedError("RSA Digital Signature Algorithm {} not supported".format(alg))
-    return signature_algorithms[alg]
+    return signature_algorithm_by_name(alg, 'RSA')
 
 
 def rsa_pkcs1v15_signature_algorithm_for_hash_id(hash_id):
-    signature_algorithms = {
-        HashID.SHA512: RS512,
-        HashID.SHA384: RS384,
-    }
-    return signature_algorithms.get(hash_id, RS256)
+    return _rsa_by_hash_id.get(hash_id, RS256)
@@ -1,11 +1,14 @@
 from __future__ import unicode_literals
 
 import collections
+import itertools
 import json
+import re
 
 import six
 
 from . import hash as hash_
+from . import trace
 from . import util
 
 namedtuple = collections.namedtuple
@@ -17,7 +20,7 @@ def detect_json_indent(json_content):
         quote_index = json_content[1:].find('"')
         if quote_index > 0:
             indent = json_content[2:quote_index + 1]
-        return indent
+    return indent
 
 
 class JSONSignError(Exception):
@@ -32,33 +35,52 @@ class JSONEncoder(json.JSONEncoder):
 
 
 class JsHeader(object):
+    __slots__ = ('jwk', 'algorithm', 'chain')
+
     def __init__(self, jwk, algorithm, chain=None):
         super(JsHeader, self).__init__()
-        chain = chain or []
+        # `jwk` is the key shared through `key.jwk_cache`, no chain is a shared empty tuple
+        chain = chain or ()
         self.jwk = jwk
         self.algorithm = algorithm
         self.chain = chain
 
     def json(self):
-        data = collections.OrderedDict((
-            ('jwk', self.jwk),
-            ('alg', self.algorithm),
-        ))
+        data = collections.OrderedDict()
+        if self.jwk is not None:
+            data['jwk'] = self.jwk
+        data['alg'] = self.algorithm
         if self.chain:
-            data['chain'] = self.chain
+            data['x5c'] = self.chain
         return data
 
+    def public_key(self):
+        """The signing key: the leaf certificate's key when there is a chain."""
+        if self.chain:
+            from libtrust.certificates import certificate_public_key
+
+            return certificate_public_key(self.chain[0])
+        return self.jwk
+
     @classmethod
     def from_map(cls, header_map):
         from libtrust.key import parse_public_key_jwk
 
-        jwk = parse_public_key_jwk(header_map['jwk'])
         algorithm = header_map['alg']
-        chain = header_map.get('chain')
+        jwk = None
+        if 'jwk' in header_map:
+            started = trace.start()
+            jwk = parse_public_key_jwk(header_map['jwk'])
+            trace.finish(started, trace.PARSE_JWK, header_map['jwk'].get('kty'), algorithm)
+        # `chain` was written by earlier versions of this library
+        chain = header_map.get('x5c', header_map.get('chain'))
         return cls(jwk, algorithm, chain=chain)
 
 
 class JsSignature(object):
+    # `signature` and `protected` are kept as the base64url bytes they were received as
+    __slots__ = ('header', 'signature', 'protected')
+
     def __init__(self, header, signature, protected):
         super(JsSignature, self).__init__()
         self.header = header
@@ -81,6 +103,8 @@ class JsSignature(object):
 
 
 class SignKey(object):
+    __slots__ = ('private_key', 'chain')
+
     def __init__(self, private_key, chain):
         super(SignKey, self).__init__()
         self.private_key = private_key
@@ -94,6 +118,8 @@ class SignKey(object):
 
 
 class JSONSignature(object):
+    __slots__ = ('payload', 'indent', 'format_length', 'format_tail', 'signatures')
+
     def __init__(self, payload, indent, format_length, format_tail, signatures=None):
         self.payload = payload
         self.indent = indent
@@ -102,12 +128,15 @@ class JSONSignature(object):
         self.signatures = signatures or []
 
     @classmethod
-    def from_map(cls, content):
+    def from_map(cls, content, chunk_size=util.READ_CHUNK_SIZE):
+        """Sign `content` as 3-space indented JSON with sorted keys.
+
+        The JSON is base64url encoded `chunk_size` characters at a time as it
+        is produced, the only full size buffer kept is the encoded payload.
+        """
         indent = 3
-        payload = util.dump_json(content, indent=indent, separators=(',', ': '))
-        payload_b64url = util.jose_base64_url_encode(payload.encode())
-        format_length = len(payload) - 2
-        return cls(payload_b64url, ' ' * indent, format_length, payload[format_length:])
+        payload_b64url, format_length, format_tail = build_payload(content, indent, chunk_size)
+        return cls(payload_b64url, ' ' * indent, format_length, format_tail)
 
     def protected_header(self, timestamp=None):
         protected = {
@@ -118,52 +147,155 @@ class JSONSignature(object):
         return util.jose_base64_url_encode(util.dump_json(protected).encode('utf-8'))
 
     def sign_bytes(self, protected):
-        return b'.'.join((protected, self.payload))
+        return b''.join(self.sign_parts(protected))
+
+    def sign_parts(self, protected):
+        # Hashed part by part by the keys, the payload is never copied
+        return protected, b'.', self.payload
 
     def sign(self, private_key, timestamp=None):
+        started = trace.start()
+        protected = self.protected_header(timestamp=timestamp)
+        trace.finish(started, trace.PROTECTED_HEADER)
+
+        started = trace.start()
+        sign_parts = self.sign_parts(protected)
+        sig_bytes, algorithm = private_key.sign(sign_parts, hash_.HashID.SHA256)
+        trace.finish(started, trace.SIGN, private_key, algorithm, sign_parts)
+        self.append_signature(private_key, protected, sig_bytes, algorithm)
+        return sig_bytes, algorithm
+
+    def sign_with_chain(self, private_key, chain, timestamp=None):
+        """Sign with a key whose certificate is `chain[0]`, followed by its
+        intermediates; the chain replaces the JWK in the signature header."""
+        from libtrust.certificates import encode_chain_certificate
+
+        chain = [encode_chain_certificate(certificate) for certificate in chain]
+        protected = self.protected_header(timestamp=timestamp)
+        sig_bytes, algorithm = private_key.sign(self.sign_parts(protected), hash_.HashID.SHA256)
+        self.append_signature(private_key, protected, sig_bytes, algorithm, chain=chain)
+        return sig_bytes, algorithm
+
+    def sign_many(self, private_keys, timestamp=None, max_workers=None, executor=None):
+        """Sign with several keys sharing one timestamp and protected header.
+
+        The private-key operations run on a thread pool (or on `executor`,
+        which must be thread based as keys can not be pickled). Signatures are
+        appended in the order of `private_keys` and their `(signature, alg)`
+        pairs are returned in the same order.
+        """
+        from libtrust import batch
+
+        private_keys = list(private_keys)
         protected = self.protected_header(timestamp=timestamp)
-        sign_bytes = six.StringIO(self.sign_bytes(protected).decode())
+        sign_parts = self.sign_parts(protected)
 
-        sig_bytes, algorithm = private_key.sign(sign_bytes, hash_.HashID.SHA256)
+        sign = lambda private_key: private_key.sign(sign_parts, hash_.HashID.SHA256)
+        if len(private_keys) > 1:
+            results = batch.map_ordered(sign, private_keys, max_workers=max_workers, executor=executor)
+        else:
+            results = [sign(private_key) for private_key in private_keys]
+
+        for private_key, (sig_bytes, algorithm) in zip(private_keys, results):
+            self.append_signature(private_key, protected, sig_bytes, algorithm)
+        return results
+
+    def append_signature(self, private_key, protected, sig_bytes, algorithm, chain=None):
         self.signatures.append(
             JsSignature(
                 JsHeader(
-                    private_key.public_key(),
-                    algorithm
+                    None if chain else private_key.public_key(),
+                    algorithm,
+                    chain=chain
                 ),
                 util.jose_base64_url_encode(sig_bytes),
                 protected
             )
         )
-        return sig_bytes, algorithm
-
-    def verify(self):
-        keys = []
-        for sign in self.signatures:
-            sign_bytes = self.sign_bytes(sign.protected)
-            if sign.header.chain:
-                raise NotImplementedError()
-            elif sign.header.jwk:
-                public_key = sign.header.jwk
-            else:
-                raise JSONSignError("missing public key")
-
-            sig_bytes = util.jose_base64_url_decode(sign.signature)
 
-            try:
-                public_key.verify(six.StringIO(sign_bytes.decode()), sign.header.algorithm, sig_bytes)
-            except Exception as e:
-                raise e
+    def verify(self, chain_verifier=None, cache=None, policy=None):
+        """Verify every signature and return their public keys.
 
-            keys.append(public_key)
+        Chain signatures are checked with the leaf certificate's key; the
+        chain itself is only validated when a `certificates.ChainVerifier`
+        is given. With a `cache.VerifyCache`, signatures verified (or
+        rejected) before are answered from it. A `policy.Policy` decides
+        which signatures must verify, see `Policy.verify`.
+        """
+        if policy is not None:
+            return policy.verify(self, chain_verifier=chain_verifier, cache=cache)
 
+        keys = []
+        for sign in self.signatures:
+            keys.append(self.verify_signature(sign, self.signature_key(sign), chain_verifier, cache))
         return keys
 
+    @staticmethod
+    def signature_key(sign):
+        """The public key that made the `JsSignature` `sign`, from its JWK or leaf certificate."""
+        public_key = sign.header.public_key()
+        if public_key is None:
+            raise JSONSignError("missing public key")
+        return public_key
+
+    def verify_signature(self, sign, public_key, chain_verifier=None, cache=None):
+        """Verify one of the signatures with `public_key` and return the key.
+
+        The building block of `verify`, for callers that choose which
+        signatures to verify and with which keys, such as `policy.Policy`.
+        """
+        if sign.header.chain and chain_verifier is not None:
+            chain_verifier.verify(sign.header.chain)
+        if cache is not None:
+            return self._verify_signature_cached(sign, public_key, cache)
+        self._verify_signature(sign, public_key)
+        return public_key
+
+    def _verify_signature_cached(self, sign, public_key, cache):
+        cache_key = cache.key(sign.protected, self.payload, sign.signature, public_key.key_id(), sign.header.algorithm)
+        result = cache.get(cache_key)
+        if result is not None:
+            if result.error is not None:
+                raise cache.error(result)
+            return result.public_key
+
+        try:
+            self._verify_signature(sign, public_key)
+        except Exception as e:
+            cache.put_error(cache_key, e)
+            raise
+        cache.put(cache_key, public_key)
+        return public_key
+
+    def _verify_signature(self, sign, public_key):
+        started = trace.start()
+        sig_bytes = util.jose_base64_url_decode(sign.signature)
+        trace.finish(started, trace.DECODE_SIGNATURE, public_key, sign.header.algorithm, sign.signature)
+
+        started = trace.start()
+        sign_parts = self.sign_parts(sign.protected)
+        try:
+            public_key.verify(sign_parts, sign.header.algorithm, sig_bytes)
+        finally:
+            trace.finish(started, trace.VERIFY, public_key, sign.header.algorithm, sign_parts)
+
+    def verify_chains(self, chain_verifier):
+        """Verify the signatures made with a certificate chain and return the validated chains."""
+        chains = []
+        for sign in self.signatures:
+            if not sign.header.chain:
+                continue
+            chain = chain_verifier.verify(sign.header.chain)
+            self._verify_signature(sign, sign.header.public_key())
+            chains.append(chain)
+        return chains
+
     def jws(self):
         if not self.signatures:
             raise JSONSignError("missing signature")
 
-        self.signatures.sort()
+        # Same order as docker/libtrust: by key id, then by signature
+        self.signatures.sort(key=lambda sign: (sign.header.public_key().key_id(), sign.signature))
         json_map = collections.OrderedDict((
             ('payload', self.payload.decode('utf-8')),
             ('signatures', self.signatures)
@@ -172,22 +304,15 @@ class JSONSignature(object):
 
     @classmethod
     def new_json_signature(cls, content, *signatures):
-        indent = detect_json_indent(content)
-        payload = util.jose_base64_url_encode(content.encode('utf-8'))
-
-        not_space = lambda c: c not in ('\t', '\n', '\v', '\f', '\r', ' ', '\x85', '\xa0')
-        last_index_func = lambda d, f: len(d) - next((i for i, c in enumerate(d[::-1]) if f(c)), -1) - 1
-
-        close_index = last_index_func(content, not_space)
-        if content[close_index] != '}':
-            raise JSONSignError("invalid json content")
-
-        last_rune_index = last_index_func(content[:close_index], not_space)
-        if content[last_rune_index] == ',':
-            raise JSONSignError("invalid json content")
+        return cls._new_json_signature(content, signatures)
 
-        format_length = last_rune_index + 1
-        format_tail = content[format_length:]
+    @classmethod
+    def _new_json_signature(cls, content, signatures, payload=None):
+        # `payload` is the canonical base64url encoding of `content` when the caller already has it
+        indent = detect_json_indent(content)
+        if payload is None:
+            payload = util.jose_base64_url_encode(content.encode('utf-8'))
+        format_length, format_tail = format_tail_of(content)
 
         signatures = [JsSignature.from_map(sign) for sign in signatures]
 
@@ -196,14 +321,239 @@ class JSONSignature(object):
 
     @classmethod
     def parse_jws(cls, content):
+        started = trace.start()
         parsed = json.loads(content)
-        for f in ('payload', 'signatures'):
-            if f not in parsed:
-                raise JSONSignError("field `{}` missed".format(f))
-
-        if not parsed['signatures']:
-            raise JSONSignError("missing signatures")
+        trace.finish(started, trace.PARSE_JSON, payload=content)
+        check_jws_fields(parsed)
+
+        started = trace.start()
+        payload = parsed['payload'].encode('utf-8')
+        content = util.jose_base64_url_decode(payload).decode('utf-8')
+        trace.finish(started, trace.DECODE_PAYLOAD, payload=payload)
+        if not util.is_canonical_base64_url(payload):
+            # Not canonical: sign and verify over the re-encoded payload, as docker/libtrust does
+            payload = None
+        return cls._new_json_signature(content, parsed.get('signatures', []), payload)
 
-        payload = util.jose_base64_url_decode(parsed['payload'].encode('utf-8')).decode('utf-8')
-        js = cls.new_json_signature(payload, *parsed.get('signatures', []))
-        return js
+    @classmethod
+    def parse_jws_stream(cls, stream, chunk_size=util.READ_CHUNK_SIZE):
+        """Parse a JWS from a file object or an iterator of chunks.
+
+        Unlike `parse_jws` the base64url payload is kept as received, when it
+        is canonical, and decoded one chunk at a time to find
+        `formatLength`/`formatTail`, so about one copy of the payload is held
+        in memory.
+        """
+        document = read_stream(stream, chunk_size)
+
+        started = trace.start()
+        start, end = find_payload(document)
+        # Everything but the payload is small, parse it with an empty payload
+        parsed = json.loads((document[:start] + document[end:]).decode('utf-8'))
+        trace.finish(started, trace.PARSE_JSON, payload=document)
+        check_jws_fields(parsed)
+
+        # Trim the document down to the payload in place
+        del document[end:]
+        del document[:start]
+        if not util.is_canonical_base64_url(document):
+            # Sign and verify over the re-encoded payload, as `parse_jws` does
+            document = bytearray(util.jose_base64_url_encode(util.jose_base64_url_decode(bytes(document))))
+
+        started = trace.start()
+        indent, format_length, format_tail = scan_payload_format(document, chunk_size)
+        trace.finish(started, trace.DECODE_PAYLOAD, payload=document)
+        signatures = [JsSignature.from_map(sign) for sign in parsed['signatures']]
+        return cls(document, indent, format_length, format_tail, signatures=signatures)
+
+
+JSON_SPACES = '\t\n\v\f\r \x85\xa0'
+# Bytes of the UTF-8 encoded `JSON_SPACES`, stripping them may also strip the end of other runes
+JSON_SPACE_BYTES = b' \t\n\v\f\r\xc2\x85\xa0'
+UTF8_CONTINUATION_BYTES = bytes(bytearray(range(0x80, 0xc0)))
+
+_JSON_TOKEN = re.compile(br'["{}\[\]]')
+_JSON_STRING_END = re.compile(br'["\\]')
+
+
+def check_jws_fields(parsed):
+    for f in ('payload', 'signatures'):
+        if f not in parsed:
+            raise JSONSignError("field `{}` missed".format(f))
+
+    if not parsed['signatures']:
+        raise JSONSignError("missing signatures")
+
+
+def format_tail_of(content):
+    close_index = len(content.rstrip(JSON_SPACES)) - 1
+    if close_index < 0 or content[close_index] != '}':
+        raise JSONSignError("invalid json content")
+
+    last_rune_index = len(content[:close_index].rstrip(JSON_SPACES)) - 1
+    if content[last_rune_index] == ',':
+        raise JSONSignError("invalid json content")
+
+    format_length = last_rune_index + 1
+    return format_length, content[format_length:]
+
+
+def build_payload(content, indent, chunk_size=util.READ_CHUNK_SIZE):
+    """Encode `content` like `util.dump_json` with `indent` straight to base64url.
+
+    Returns the encoded payload with the `formatLength` and `formatTail` of
+    the JSON, the JSON text itself is never held as a whole.
+    """
+    encoder = json.JSONEncoder(sort_keys=True, indent=indent, separators=(',', ': '))
+    payload = util.JoseBase64URLEncoder()
+    length = 0
+    tail = ''
+    chunks = []
+    size = 0
+    for chunk in itertools.chain(encoder.iterencode(content), [None]):
+        if chunk is not None:
+            chunks.append(chunk)
+            size += len(chunk)
+            if size < chunk_size:
+                continue
+        if not chunks:
+            break
+
+        text = ''.join(chunks)
+        # `ensure_ascii` is on, so characters and bytes are the same thing
+        payload.update(text.encode('ascii'))
+        length += len(text)
+        tail = (tail + text)[-2:]
+        chunks = []
+        size = 0
+
+    format_length = length - 2
+    return payload.finalize(), format_length, tail
+
+
+def read_stream(stream, chunk_size):
+    document = bytearray()
+    chunks = iter(lambda: stream.read(chunk_size), stream.read(0)) if hasattr(stream, 'read') else stream
+    for chunk in chunks:
+        if isinstance(chunk, six.text_type):
+            chunk = chunk.encode('utf-8')
+        document += chunk
+    return document
+
+
+def _skip_ws(document, i):
+    while i < len(document) and document[i:i + 1] in (b' ', b'\t', b'\n', b'\r'):
+        i += 1
+    return i
+
+
+def _skip_string(document, i):
+    # `i` is the index of the opening quote, returns the index after the closing one
+    while True:
+        match = _JSON_STRING_END.search(document, i + 1)
+        if match is None:
+            raise JSONSignError("invalid jws content")
+        i = match.start()
+        if document[i:i + 1] == b'"':
+            return i + 1
+        i += 1
+
+
+def _skip_value(document, i):
+    if document[i:i + 1] == b'"':
+        return _skip_string(document, i)
+    if document[i:i + 1] not in (b'{', b'['):
+        while i < len(document) and document[i:i + 1] not in (b',', b'}', b']', b' ', b'\t', b'\n', b'\r'):
+            i += 1
+        return i
+
+    depth = 0
+    while True:
+        match = _JSON_TOKEN.search(document, i)
+        if match is None:
+            raise JSONSignError("invalid jws content")
+        i = match.start()
+        token = document[i:i + 1]
+        if token == b'"':
+            i = _skip_string(document, i)
+            continue
+        depth += 1 if token in (b'{', b'[') else -1
+        i += 1
+        if not depth:
+            return i
+
+
+def find_payload(document):
+    """Return the span of the top-level `payload` string value in `document`."""
+    span = None
+    i = _skip_ws(document, 0)
+    if document[i:i + 1] != b'{':
+        raise JSONSignError("invalid jws content")
+    i += 1
+
+    while True:
+        i = _skip_ws(document, i)
+        if document[i:i + 1] == b'}':
+            break
+        if document[i:i + 1] != b'"':
+            raise JSONSignError("invalid jws content")
+        key_end = _skip_string(document, i)
+        key = document[i + 1:key_end - 1]
+
+        i = _skip_ws(document, key_end)
+        if document[i:i + 1] != b':':
+            raise JSONSignError("invalid jws content")
+        i = _skip_ws(document, i + 1)
+
+        if key == b'payload' and document[i:i + 1] == b'"':
+            end = document.find(b'"', i + 1)
+            if end < 0 or document.find(b'\\', i + 1, end) >= 0:
+                raise JSONSignError("invalid jws payload")
+            span = (i + 1, end)
+            i = end + 1
+        else:
+            i = _skip_value(document, i)
+
+        i = _skip_ws(document, i)
+        if document[i:i + 1] == b',':
+            i += 1
+        elif document[i:i + 1] != b'}':
+            raise JSONSignError("invalid jws content")
+
+    if span is None:
+        raise JSONSignError("field `payload` missed")
+    return span
+
+
+def scan_payload_format(payload, chunk_size):
+    """Decode a base64url payload chunk by chunk and return `(indent, formatLength, formatTail)`."""
+    chunk_size = max(chunk_size // 4 * 4, 4)
+    window_size = 4096
+    indent = None
+    head = b''
+    char_count = 0
+    window = b''
+
+    view = memoryview(payload)
+    for offset in range(0, len(payload), chunk_size):
+        decoded = util.jose_base64_url_decode(view[offset:offset + chunk_size].tobytes())
+        if indent is None:
+            # The indent runs up to the first key, which may be past the first chunk
+            head += decoded
+            if b'"' in head or b'}' in head:
+                indent = detect_json_indent(head.decode('utf-8', 'ignore'))
+        char_count += len(decoded.translate(None, UTF8_CONTINUATION_BYTES))
+
+        window += decoded
+        if len(window) > window_size:
+            # Keep the closing rune, the trailing spaces and a full rune before the closing one
+            before_close = window.rstrip(JSON_SPACE_BYTES)[:-1].rstrip(JSON_SPACE_BYTES)
+            if len(before_close) > 8:
+                window = window[len(before_close) - 8:]
+
+    if indent is None:
+        indent = detect_json_indent(head.decode('utf-8', 'ignore'))
+    text = window.lstrip(UTF8_CONTINUATION_BYTES).decode('utf-8')
+    offset = char_count - len(text)
+    format_length, format_tail = format_tail_of(text)
+    return indent, offset + format_length, format_tail
@@ -2,18 +2,37 @@ from __future__ import unicode_literals
 
 import collections
 
+from . import cache
 from . import util
 
-__all__ = ['parse_public_key_jwk']
+__all__ = [
+    'parse_public_key_jwk', 'from_crypto_public_key', 'from_crypto_private_key', 'load_private_key_pem', 'jwk_cache',
+    'set_jwk_cache_size', 'register_key_type',
+]
+
+# How to parse a public key JWK of a `kty` and which of its members identify the key
+KeyType = collections.namedtuple('KeyType', ('parser', 'members'))
+
+# Registered key types by `kty`, the built-in ones register when their module is imported
+key_types = {}
+
+# Parsed public keys shared between every `parse_public_key_jwk` caller
+jwk_cache = cache.LRUCache(maxsize=1024)
 
 
 class PublicKey(object):
+    __slots__ = ()
+
     def key_type(self):
         raise NotImplementedError()
 
     def key_id(self):
         raise NotImplementedError()
 
+    def fingerprint(self):
+        """SHA-256 digest of the DER encoded public key, `key_id` is derived from it."""
+        raise NotImplementedError()
+
     def crypto_public_key(self):
         raise NotImplementedError()
 
@@ -24,6 +43,7 @@ class PublicKey(object):
         raise NotImplementedError()
 
     def verify(self, buffer, alg, signature):
+        """Verify `signature` over `buffer`, see `util.iter_buffer` for the accepted buffers."""
         raise NotImplementedError()
 
     def marshal_json(self):
@@ -34,6 +54,8 @@ class PublicKey(object):
 
 
 class PrivateKey(PublicKey):
+    __slots__ = ()
+
     def public_key(self):
         raise NotImplementedError()
 
@@ -41,15 +63,80 @@ class PrivateKey(PublicKey):
         raise NotImplementedError()
 
     def sign(self, buffer, hash_id):
+        """Sign `buffer` and return `(signature, alg)`, see `util.iter_buffer` for the accepted buffers."""
         raise NotImplementedError()
 
 
-def parse_public_key_jwk(jwk):
+def set_jwk_cache_size(maxsize):
+    """Resize the parsed JWK cache; `None` is unbounded and `0` disables it."""
+    jwk_cache.resize(maxsize)
+
+
+def register_key_type(kty, parser, members):
+    """Parse JWKs of type `kty` with `parser(jwk)`, caching the keys by their `members`."""
+    key_types[kty] = KeyType(parser, tuple(members))
+
+
+def _key_type(kty):
+    if kty not in key_types:
+        # Importing the built-in key modules registers their key types
+        from libtrust import ec_key  # noqa
+        from libtrust import rsa_key  # noqa
+
+    try:
+        return key_types[kty]
+    except KeyError:
+        raise NotImplementedError("key type {} not supported".format(kty))
+
+
+def parse_public_key_jwk(jwk, use_cache=True):
+    """Parse a public key JWK map, reusing the key parsed for an identical JWK.
+
+    The returned key object is shared between callers and must not be mutated.
+    """
+    kty = jwk['kty']
+    key_type = _key_type(kty)
+    if not use_cache:
+        return key_type.parser(jwk)
+
+    cache_key = (kty,) + tuple(jwk[member] for member in key_type.members)
+    return jwk_cache.get_or_create(cache_key, lambda: key_type.parser(jwk))
+
+
+def from_crypto_public_key(crypto_public_key):
+    """Wrap a `cryptography` public key in the matching libtrust key class."""
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
     from libtrust import ec_key
     from libtrust import rsa_key
 
-    kty = jwk['kty']
-    return {
-        'EC': ec_key.ec_public_key_from_map,
-        'RSA': rsa_key.rsa_public_key_from_map
-    }[kty](jwk)
+    if isinstance(crypto_public_key, rsa.RSAPublicKey):
+        return rsa_key.RSAPublicKey(crypto_public_key)
+    if isinstance(crypto_public_key, ec.EllipticCurvePublicKey):
+        return ec_key.ECPublicKey(crypto_public_key)
+    raise NotImplementedError("public key type {} not supported".format(type(crypto_public_key).__name__))
+
+
+def from_crypto_private_key(crypto_private_key):
+    """Wrap a `cryptography` private key in the matching libtrust key class."""
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    from libtrust import ec_key
+    from libtrust import rsa_key
+
+    if isinstance(crypto_private_key, rsa.RSAPrivateKey):
+        return rsa_key.RSAPrivateKey(crypto_private_key)
+    if isinstance(crypto_private_key, ec.EllipticCurvePrivateKey):
+        return ec_key.ECPrivateKey(crypto_private_key)
+    raise NotImplementedError("private key type {} not supported".format(type(crypto_private_key).__name__))
+
+
+def load_private_key_pem(pem_data, passphrase=None):
+    """Load a PEM encoded RSA or EC private key."""
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives import serialization
+
+    crypto_private_key = serialization.load_pem_private_key(pem_data, passphrase, default_backend())
+    return from_crypto_private_key(crypto_private_key)
@@ -0,0 +1,128 @@
+from __future__ import unicode_literals
+
+import collections
+import hashlib
+import os
+import threading
+
+from . import cache
+from . import key
+
+__all__ = ['KeyLoader', 'LoadedKey']
+
+# A loaded key with the modification time, size and SHA-256 of the file it came from
+LoadedKey = collections.namedtuple('LoadedKey', ('private_key', 'mtime', 'size', 'digest'))
+
+
+def _stat(path):
+    st = os.stat(path)
+    return getattr(st, 'st_mtime_ns', st.st_mtime), st.st_size
+
+
+class KeyLoader(object):
+    """Load PEM private keys from files and reload them when the files change.
+
+    A file is only read again when its modification time or size changed and
+    only parsed again when its content did, parsed keys are cached by the
+    SHA-256 of the PEM data. Loaded keys are published by swapping in a new
+    mapping, so `get` never takes a lock and never sees a half-loaded key; a
+    file that fails to parse leaves the previous key in place and its error
+    in `errors`.
+
+        loader = KeyLoader()
+        loader.watch(interval=5)
+        private_key = loader.get('/etc/signer/key.pem')
+    """
+
+    def __init__(self, passphrase=None, cache_size=16):
+        self.passphrase = passphrase
+        self.errors = {}
+        self._entries = {}
+        self._parsed = cache.LRUCache(maxsize=cache_size)
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._stop = None
+        self._watcher = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def get(self, path):
+        """Return the private key of `path`, loading it on first use."""
+        entry = self._entries.get(os.path.abspath(path))
+        if entry is None:
+            entry = self.load(path)
+        return entry.private_key
+
+    def paths(self):
+        return list(self._entries)
+
+    def add_listener(self, listener):
+        """Call `listener(path, private_key)` whenever a reload changes a key."""
+        self._listeners.append(listener)
+
+    def load(self, path):
+        """(Re)load `path` if it changed and return its `LoadedKey`."""
+        path = os.path.abspath(path)
+        mtime, size = _stat(path)
+        entry = self._entries.get(path)
+        if entry is not None and (entry.mtime, entry.size) == (mtime, size):
+            return entry
+
+        with open(path, 'rb') as f:
+            pem_data = f.read()
+        digest = hashlib.sha256(pem_data).digest()
+        private_key = self._parsed.get_or_create(
+            (digest, self.passphrase),
+            lambda: key.load_private_key_pem(pem_data, self.passphrase)
+        )
+        new_entry = LoadedKey(private_key, mtime, size, digest)
+
+        with self._lock:
+            previous = self._entries.get(path)
+            entries = dict(self._entries)
+            entries[path] = new_entry
+            self._entries = entries
+            self.errors.pop(path, None)
+
+        if previous is None or previous.digest != digest:
+            for listener in list(self._listeners):
+                listener(path, private_key)
+        return new_entry
+
+    def refresh(self):
+        """Reload every known path that changed, return the paths whose key changed."""
+        changed = []
+        for path, entry in list(self._entries.items()):
+            try:
+                if self.load(path).digest != entry.digest:
+                    changed.append(path)
+            except Exception as e:
+                self.errors[path] = e
+        return changed
+
+    def watch(self, interval=1.0):
+        """Refresh every `interval` seconds on a daemon thread until `stop`.
+
+        The thread sleeps on an event between checks, it does not spin.
+        """
+        if self._watcher is not None:
+            return
+        self._stop = threading.Event()
+        self._watcher = threading.Thread(target=self._watch, args=(self._stop, interval), name='libtrust-keyloader')
+        self._watcher.daemon = True
+        self._watcher.start()
+
+    def _watch(self, stop, interval):
+        while not stop.wait(interval):
+            self.refresh()
+
+    def stop(self):
+        if self._watcher is None:
+            return
+        self._stop.set()
+        self._watcher.join()
+        self._watcher = None
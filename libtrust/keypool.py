@@ -0,0 +1,117 @@
+from __future__ import unicode_literals
+
+import collections
+import functools
+import threading
+
+from concurrent import futures
+
+from . import batch
+
+__all__ = ['KeyPool', 'generate_private_key']
+
+
+def generate_private_key(kty, param):
+    """Generate a private key of type `kty`, `param` is the RSA bit size or the EC `crv`."""
+    from libtrust import ec_key
+    from libtrust import rsa_key
+
+    if kty == 'RSA':
+        return rsa_key.generate_private_key(param)
+    if kty == 'EC':
+        return ec_key.generate_private_key(param)
+    raise NotImplementedError("key type {} not supported".format(kty))
+
+
+def _generate_pem(kty, param):
+    # Key objects can not be pickled, process workers send the PEM back
+    private_key = generate_private_key(kty, param)
+    return type(private_key), private_key.pem_block()
+
+
+class KeyPool(object):
+    """Keep `size` freshly generated private keys ready for each `(kty, param)` kind.
+
+    Keys are generated on a thread (or process) pool and refilled in the
+    background as they are taken, so `get` only generates inline when the
+    pool of that kind has run dry. Every key is handed out once.
+
+        pool = KeyPool([('RSA', 4096), ('EC', 'P-256')], size=8)
+        private_key = pool.get('RSA', 4096)
+    """
+
+    def __init__(self, kinds, size=4, max_workers=None, executor=None, processes=False):
+        self.size = size
+        self._processes = processes or isinstance(executor, futures.ProcessPoolExecutor)
+        self._own_executor = executor is None
+        self._executor = executor or batch.create_executor(max_workers=max_workers, processes=processes)
+        self._ready = dict((tuple(kind), collections.deque()) for kind in kinds)
+        self._pending = dict.fromkeys(self._ready, 0)
+        self._lock = threading.Lock()
+        self._closed = False
+        for kind in self._ready:
+            self._refill(kind)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def available(self, kty, param):
+        ready = self._ready.get((kty, param))
+        return len(ready) if ready is not None else 0
+
+    def get(self, kty, param, block=True):
+        """Take a ready key of the kind, generating one inline if none is ready.
+
+        With `block=False` `None` is returned instead of generating inline.
+        Kinds the pool was not created with are always generated inline.
+        """
+        kind = (kty, param)
+        ready = self._ready.get(kind)
+        if ready is None:
+            return generate_private_key(kty, param) if block else None
+
+        try:
+            private_key = ready.popleft()
+        except IndexError:
+            private_key = None
+        self._refill(kind)
+
+        if private_key is None and block:
+            private_key = generate_private_key(kty, param)
+        return private_key
+
+    def _refill(self, kind):
+        with self._lock:
+            if self._closed:
+                return
+            missing = self.size - len(self._ready[kind]) - self._pending[kind]
+            if missing <= 0:
+                return
+            self._pending[kind] += missing
+
+        func = _generate_pem if self._processes else generate_private_key
+        for _ in range(missing):
+            future = self._executor.submit(func, *kind)
+            future.add_done_callback(functools.partial(self._generated, kind))
+
+    def _generated(self, kind, future):
+        with self._lock:
+            self._pending[kind] -= 1
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        private_key = future.result()
+        if self._processes:
+            key_class, pem_data = private_key
+            private_key = key_class.from_pem(pem_data)
+        self._ready[kind].append(private_key)
+
+    def close(self, wait=True):
+        """Stop refilling; the pool's own executor is shut down."""
+        with self._lock:
+            self._closed = True
+        if self._own_executor:
+            self._executor.shutdown(wait=wait)
@@ -0,0 +1,159 @@
+"""JWK Sets of public keys, serialized once and served over WSGI.
+
+Serve PEM keys locally, for example to load test the conditional GETs:
+
+    python -m libtrust.keyset --port 8080 public.pem ec-private.pem
+"""
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import collections
+import hashlib
+import threading
+
+from . import key
+from . import util
+
+__all__ = ['KeySet', 'KeySetSnapshot', 'wsgi_app']
+
+# The serialized JWKS and its strong ETag
+KeySetSnapshot = collections.namedtuple('KeySetSnapshot', ('body', 'etag'))
+
+CONTENT_TYPE = 'application/jwk-set+json'
+
+
+class KeySet(object):
+    """A set of public keys, by key id, with its JWKS document cached.
+
+    Each key is converted to a JWK once when it is added; the document and
+    its ETag are rebuilt on the first read after the membership changed.
+    Reads of an unchanged set never take the lock.
+    """
+
+    def __init__(self, public_keys=()):
+        self._keys = {}
+        self._jwks = {}
+        self._snapshot = None
+        self._lock = threading.Lock()
+        for public_key in public_keys:
+            self.add(public_key)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, kid):
+        return kid in self._keys
+
+    def __iter__(self):
+        return iter(sorted(self._keys))
+
+    def get(self, kid, default=None):
+        return self._keys.get(kid, default)
+
+    def add(self, public_key):
+        """Add a public key (or the public half of a private key)."""
+        if isinstance(public_key, key.PrivateKey):
+            public_key = public_key.public_key()
+        kid = public_key.key_id()
+        jwk = public_key.to_map()
+        with self._lock:
+            if self._jwks.get(kid) == jwk:
+                return
+            self._keys[kid] = public_key
+            self._jwks[kid] = jwk
+            self._snapshot = None
+
+    def remove(self, kid):
+        with self._lock:
+            if self._keys.pop(kid, None) is not None:
+                del self._jwks[kid]
+                self._snapshot = None
+
+    def snapshot(self):
+        """Return the current `KeySetSnapshot`, building it if the set changed."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None:
+                document = {'keys': [self._jwks[kid] for kid in sorted(self._jwks)]}
+                body = util.dump_json(document).encode('utf-8')
+                self._snapshot = KeySetSnapshot(body, '"{}"'.format(hashlib.sha256(body).hexdigest()))
+            return self._snapshot
+
+    def json_bytes(self):
+        return self.snapshot().body
+
+    def etag(self):
+        return self.snapshot().etag
+
+
+def _etag_matches(if_none_match, etag):
+    if if_none_match.strip() == '*':
+        return True
+    # A weak comparison, as RFC 7232 asks for If-None-Match
+    tags = (tag.strip() for tag in if_none_match.split(','))
+    return any((tag[2:] if tag.startswith('W/') else tag) == etag for tag in tags)
+
+
+def wsgi_app(key_set, max_age=None):
+    """A WSGI application serving `key_set` on every path, with conditional GET."""
+
+    def application(environ, start_response):
+        method = environ.get('REQUEST_METHOD', 'GET')
+        if method not in ('GET', 'HEAD'):
+            start_response(str('405 Method Not Allowed'), [(str('Allow'), str('GET, HEAD'))])
+            return [b'']
+
+        snapshot = key_set.snapshot()
+        headers = [(str('ETag'), str(snapshot.etag))]
+        if max_age is not None:
+            headers.append((str('Cache-Control'), str('max-age={}'.format(max_age))))
+
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+        if if_none_match and _etag_matches(if_none_match, snapshot.etag):
+            start_response(str('304 Not Modified'), headers)
+            return [b'']
+
+        headers.extend((
+            (str('Content-Type'), str(CONTENT_TYPE)),
+            (str('Content-Length'), str(len(snapshot.body))),
+        ))
+        start_response(str('200 OK'), headers)
+        return [b''] if method == 'HEAD' else [snapshot.body]
+
+    return application
+
+
+def load_pem_key(pem_data):
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives import serialization
+
+    if b'PRIVATE KEY' in pem_data:
+        return key.load_private_key_pem(pem_data)
+    return key.from_crypto_public_key(serialization.load_pem_public_key(pem_data, default_backend()))
+
+
+def main(argv=None):
+    from wsgiref import simple_server
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('keys', nargs='+', help="PEM encoded public or private keys")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args(argv)
+
+    key_set = KeySet()
+    for path in args.keys:
+        with open(path, 'rb') as f:
+            key_set.add(load_pem_key(f.read()))
+
+    server = simple_server.make_server(args.host, args.port, wsgi_app(key_set))
+    print('serving {} keys on http://{}:{}/'.format(len(key_set), args.host, args.port))
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
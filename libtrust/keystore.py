@@ -0,0 +1,181 @@
+from __future__ import unicode_literals
+
+import mmap
+import os
+import struct
+import tempfile
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+
+from . import cache
+from . import key
+
+__all__ = ['KeyStore', 'KeyStoreError']
+
+# File layout, all integers big endian:
+#   header: magic, version, reserved, entry count
+#   index:  `count` entries of (key id padded with NUL, data offset, data length), sorted by key id
+#   data:   DER encoded SubjectPublicKeyInfo of every key
+MAGIC = b'LTKS'
+VERSION = 1
+HEADER = struct.Struct(str('>4sHHI'))
+INDEX_ENTRY = struct.Struct(str('>64sQI'))
+KID_SIZE = 64
+
+
+class KeyStoreError(Exception):
+    pass
+
+
+def _encode_kid(kid):
+    if not isinstance(kid, bytes):
+        kid = kid.encode('ascii')
+    if len(kid) > KID_SIZE:
+        raise KeyStoreError("key id too long: {!r}".format(kid))
+    return kid.ljust(KID_SIZE, b'\x00')
+
+
+def _lookup_kid(kid):
+    # A key id that could not have been stored is simply not in the store
+    try:
+        return _encode_kid(kid)
+    except (KeyStoreError, UnicodeError):
+        return None
+
+
+def _public_key_der(public_key):
+    return public_key.crypto_public_key().public_bytes(
+        serialization.Encoding.DER,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+
+
+class KeyStore(object):
+    """A read-only, memory-mapped file of public keys indexed by key id.
+
+    Opening a store maps the file without reading it; a lookup binary-searches
+    the index and decodes only the requested key, so start-up time and memory
+    do not grow with the number of keys. Stores are written as a whole with
+    `KeyStore.write` or `KeyStore.update`.
+    """
+
+    def __init__(self, path, cache_size=256):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            # An empty file can not be mapped at all
+            if os.fstat(self._file.fileno()).st_size < HEADER.size:
+                raise KeyStoreError("{} is not a libtrust key store".format(path))
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        magic, version, _, self._count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise KeyStoreError("{} is not a libtrust key store".format(path))
+        if HEADER.size + self._count * INDEX_ENTRY.size > len(self._map):
+            self.close()
+            raise KeyStoreError("{} is truncated".format(path))
+        self._keys = cache.LRUCache(maxsize=cache_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, kid):
+        encoded = _lookup_kid(kid)
+        return encoded is not None and self._find(encoded) is not None
+
+    def __getitem__(self, kid):
+        public_key = self.get(kid)
+        if public_key is None:
+            raise KeyError(kid)
+        return public_key
+
+    def _entry(self, i):
+        return INDEX_ENTRY.unpack_from(self._map, HEADER.size + i * INDEX_ENTRY.size)
+
+    def _kid_at(self, i):
+        offset = HEADER.size + i * INDEX_ENTRY.size
+        return self._map[offset:offset + KID_SIZE]
+
+    def _find(self, kid):
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._kid_at(mid) < kid:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._kid_at(lo) == kid:
+            return lo
+        return None
+
+    def _der_at(self, i):
+        _, offset, length = self._entry(i)
+        return self._map[offset:offset + length]
+
+    def get(self, kid, default=None):
+        encoded = _lookup_kid(kid)
+        i = None if encoded is None else self._find(encoded)
+        if i is None:
+            return default
+
+        def load():
+            crypto_public_key = serialization.load_der_public_key(self._der_at(i), default_backend())
+            return key.from_crypto_public_key(crypto_public_key)
+
+        return self._keys.get_or_create(encoded, load)
+
+    def kids(self):
+        for i in range(self._count):
+            yield self._kid_at(i).rstrip(b'\x00').decode('ascii')
+
+    def __iter__(self):
+        return self.kids()
+
+    @classmethod
+    def write(cls, path, public_keys):
+        """Write `public_keys` to a new store at `path`, replacing it atomically."""
+        entries = dict((_encode_kid(public_key.key_id()), _public_key_der(public_key)) for public_key in public_keys)
+        cls._write_entries(path, entries)
+
+    @classmethod
+    def update(cls, path, public_keys):
+        """Add `public_keys` to the store at `path`, existing keys are copied without decoding."""
+        with cls(path, cache_size=0) as store:
+            entries = dict((store._kid_at(i), store._der_at(i)) for i in range(len(store)))
+        entries.update((_encode_kid(public_key.key_id()), _public_key_der(public_key)) for public_key in public_keys)
+        cls._write_entries(path, entries)
+
+    @staticmethod
+    def _write_entries(path, entries):
+        kids = sorted(entries)
+        offset = HEADER.size + len(kids) * INDEX_ENTRY.size
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.keystore-', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, 0, len(kids)))
+                for kid in kids:
+                    f.write(INDEX_ENTRY.pack(kid, offset, len(entries[kid])))
+                    offset += len(entries[kid])
+                for kid in kids:
+                    f.write(entries[kid])
+            getattr(os, 'replace', os.rename)(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
@@ -0,0 +1,90 @@
+from __future__ import unicode_literals
+
+import bisect
+
+import six
+
+__all__ = ['KeyIDIndex', 'normalize_kid']
+
+# Sorts after every base32 character, closes the range of a prefix search
+_PREFIX_END = '\x7f'
+
+
+def normalize_kid(kid):
+    """Drop the `:` group separators and whitespace of a (partial) key id, as upper case text."""
+    if isinstance(kid, six.binary_type):
+        kid = kid.decode('ascii')
+    return ''.join(kid.split()).replace(':', '').upper()
+
+
+class KeyIDIndex(object):
+    """Find keys by their libtrust key id or by a prefix of it.
+
+    Key ids are normalized with `normalize_kid`, so `ABCD:EF`, `abcdef` and
+    `ABCD:EFGH:...` with a truncated last group all match the same keys.
+    The ids are kept in one sorted list searched with `bisect`: exact and
+    prefix lookups are O(log n) and building is a single sort. Adding keys
+    one at a time is O(n) each, build the index in bulk when possible.
+    """
+
+    def __init__(self, public_keys=()):
+        pairs = ((public_key.key_id(), public_key) for public_key in public_keys)
+        self._kids, self._values = self._sorted(pairs)
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        """Build an index of `(kid, value)` pairs, the values may be anything."""
+        index = cls()
+        index._kids, index._values = cls._sorted(pairs)
+        return index
+
+    @staticmethod
+    def _sorted(pairs):
+        entries = dict((normalize_kid(kid), value) for kid, value in pairs)
+        kids = sorted(entries)
+        return kids, [entries[kid] for kid in kids]
+
+    def __len__(self):
+        return len(self._kids)
+
+    def __contains__(self, kid):
+        return self._find(normalize_kid(kid)) is not None
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def _find(self, normalized):
+        i = bisect.bisect_left(self._kids, normalized)
+        if i < len(self._kids) and self._kids[i] == normalized:
+            return i
+        return None
+
+    def add(self, public_key):
+        self.put(public_key.key_id(), public_key)
+
+    def put(self, kid, value):
+        normalized = normalize_kid(kid)
+        i = bisect.bisect_left(self._kids, normalized)
+        if i < len(self._kids) and self._kids[i] == normalized:
+            self._values[i] = value
+            return
+        self._kids.insert(i, normalized)
+        self._values.insert(i, value)
+
+    def get(self, kid, default=None):
+        i = self._find(normalize_kid(kid))
+        return default if i is None else self._values[i]
+
+    def search(self, prefix, limit=None):
+        """Return the values whose key id starts with `prefix`, in key id order."""
+        prefix = normalize_kid(prefix)
+        start = bisect.bisect_left(self._kids, prefix)
+        end = bisect.bisect_left(self._kids, prefix + _PREFIX_END, start)
+        if limit is not None:
+            end = min(end, start + limit)
+        return self._values[start:end]
+
+    def count(self, prefix):
+        prefix = normalize_kid(prefix)
+        start = bisect.bisect_left(self._kids, prefix)
+        return bisect.bisect_left(self._kids, prefix + _PREFIX_END, start) - start
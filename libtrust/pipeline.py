@@ -0,0 +1,130 @@
+from __future__ import unicode_literals
+
+import collections
+
+from concurrent import futures
+
+from . import batch
+from . import jsonsign
+
+__all__ = ['Pipeline', 'PipelineResult', 'verify_stream']
+
+# `keys` are the verified public keys of the document at `index`, or `error` is why it failed
+PipelineResult = collections.namedtuple('PipelineResult', ('index', 'document', 'keys', 'error'))
+
+# A document on its way through the stages
+_Item = collections.namedtuple('_Item', ('index', 'document', 'js', 'candidates', 'keys', 'error'))
+
+
+def _default_resolve(js):
+    return [(sign, js.signature_key(sign)) for sign in js.signatures]
+
+
+class Pipeline(object):
+    """Verify a stream of JWS documents in three stages: parse, resolve, verify.
+
+    Each stage runs on the executor with at most `max_in_flight` documents
+    submitted and not yet taken by the next stage, and the stages pull from
+    each other lazily, so an unbounded stream is verified in constant memory.
+
+    `resolve(js)` returns the `(signature, public key)` pairs to verify; by
+    default every signature with the key of its header, or the candidates of
+    `policy` when one is given. Results come in input order with
+    `ordered=True`, otherwise as soon as they are ready.
+    """
+
+    def __init__(self, resolve=None, policy=None, chain_verifier=None, cache=None, max_in_flight=32, ordered=True):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
+        self.resolver = resolve or (policy.candidates if policy is not None else _default_resolve)
+        self.policy = policy
+        self.chain_verifier = chain_verifier
+        self.cache = cache
+        self.max_in_flight = max_in_flight
+        self.ordered = ordered
+
+    @staticmethod
+    def item(index, document):
+        return _Item(index, document, None, None, None, None)
+
+    @staticmethod
+    def result(item):
+        return PipelineResult(item.index, item.document, item.keys, item.error)
+
+    def parse(self, item):
+        if isinstance(item.document, jsonsign.JSONSignature):
+            return item._replace(js=item.document)
+        try:
+            return item._replace(js=jsonsign.JSONSignature.parse_jws(item.document))
+        except Exception as e:
+            return item._replace(error=e)
+
+    def resolve(self, item):
+        try:
+            return item._replace(candidates=self.resolver(item.js))
+        except Exception as e:
+            return item._replace(error=e)
+
+    def verify(self, item):
+        try:
+            if self.policy is not None:
+                keys = self.policy.verify_candidates(item.js, item.candidates, self.chain_verifier, self.cache)
+            else:
+                keys = [item.js.verify_signature(sign, public_key, self.chain_verifier, self.cache)
+                        for sign, public_key in item.candidates]
+        except Exception as e:
+            return item._replace(error=e)
+        return item._replace(keys=keys, js=None, candidates=None)
+
+    def stages(self):
+        return self.parse, self.resolve, self.verify
+
+    def _stage(self, func, items, executor):
+        pending = collections.deque() if self.ordered else set()
+        add = pending.append if self.ordered else pending.add
+        for item in items:
+            if item.error is None:
+                future = executor.submit(func, item)
+            else:
+                # Failed documents skip the stage but keep their place
+                future = futures.Future()
+                future.set_result(item)
+            add(future)
+            while len(pending) >= self.max_in_flight:
+                for done in self._take(pending):
+                    yield done
+        while pending:
+            for done in self._take(pending):
+                yield done
+
+    def _take(self, pending):
+        if self.ordered:
+            return [pending.popleft().result()]
+        done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+        pending.difference_update(done)
+        return [future.result() for future in done]
+
+    def run(self, documents, max_workers=None, executor=None):
+        """Yield a `PipelineResult` per document of the iterable `documents`.
+
+        Documents are JWS text or parsed `JSONSignature` objects. Without
+        `executor` a thread pool of `max_workers` is used until the
+        generator is exhausted or closed.
+        """
+        own_executor = executor is None
+        if own_executor:
+            executor = batch.create_executor(max_workers=max_workers)
+        try:
+            items = (self.item(index, document) for index, document in enumerate(documents))
+            for func in self.stages():
+                items = self._stage(func, items, executor)
+            for item in items:
+                yield self.result(item)
+        finally:
+            if own_executor:
+                executor.shutdown(wait=True)
+
+
+def verify_stream(documents, max_workers=None, executor=None, **kwargs):
+    """Verify an iterable of JWS documents, see `Pipeline` for `kwargs`."""
+    return Pipeline(**kwargs).run(documents, max_workers=max_workers, executor=executor)
@@ -0,0 +1,99 @@
+from __future__ import unicode_literals
+
+from . import jsonsign
+
+__all__ = ['Policy', 'all_of', 'any_of', 'quorum', 'verify_cost', 'VERIFY_COSTS']
+
+# Relative cost of one verification by key type and size, RSA-2048 is 1.
+# Measured with OpenSSL 1.1: RSA verification with e=65537 is cheaper than ECDSA.
+VERIFY_COSTS = {
+    ('RSA', 2048): 1.0,
+    ('RSA', 3072): 1.6,
+    ('RSA', 4096): 2.3,
+    ('EC', 256): 2.7,
+    ('EC', 384): 21.0,
+    ('EC', 521): 16.0,
+}
+
+# Cost of keys missing from `VERIFY_COSTS`, they are tried last
+UNKNOWN_VERIFY_COST = 100.0
+
+
+def verify_cost(public_key):
+    key_size = getattr(getattr(public_key, 'key', None), 'key_size', None)
+    return VERIFY_COSTS.get((public_key.key_type(), key_size), UNKNOWN_VERIFY_COST)
+
+
+class Policy(object):
+    """Which signatures of a `JSONSignature` have to verify.
+
+    `required=None` requires every signature, otherwise `required` distinct
+    keys must produce a valid signature and invalid signatures are tolerated.
+    With `trusted_kids`, signatures by other keys are skipped without any
+    crypto work (and fail the policy when every signature is required).
+    Candidates are verified cheapest first and verification stops as soon as
+    the policy is satisfied, or can no longer be.
+    """
+
+    def __init__(self, required=None, trusted_kids=None, cheapest_first=True):
+        if required is not None and required < 1:
+            raise ValueError("required must be None or >= 1")
+        self.required = required
+        self.trusted_kids = frozenset(trusted_kids) if trusted_kids is not None else None
+        self.cheapest_first = cheapest_first
+
+    def candidates(self, js):
+        """The `(signature, public key)` pairs to verify, in verification order."""
+        candidates = []
+        for sign in js.signatures:
+            public_key = js.signature_key(sign)
+            if self.trusted_kids is not None and public_key.key_id() not in self.trusted_kids:
+                if self.required is None:
+                    raise jsonsign.JSONSignError("signature by untrusted key {}".format(public_key.key_id()))
+                continue
+            candidates.append((sign, public_key))
+
+        if self.cheapest_first:
+            candidates.sort(key=lambda candidate: verify_cost(candidate[1]))
+        return candidates
+
+    def verify(self, js, chain_verifier=None, cache=None):
+        """Verify `js` and return the keys that satisfied the policy.
+
+        Raises `JSONSignError` when fewer than `required` distinct keys verified.
+        """
+        return self.verify_candidates(js, self.candidates(js), chain_verifier=chain_verifier, cache=cache)
+
+    def verify_candidates(self, js, candidates, chain_verifier=None, cache=None):
+        """Verify the `(signature, public key)` pairs returned by `candidates`."""
+        if self.required is None:
+            return [js.verify_signature(sign, public_key, chain_verifier, cache) for sign, public_key in candidates]
+
+        keys = []
+        kids = set()
+        for i, (sign, public_key) in enumerate(candidates):
+            if len(kids) + len(candidates) - i < self.required:
+                break
+            if public_key.key_id() in kids:
+                continue
+            try:
+                keys.append(js.verify_signature(sign, public_key, chain_verifier, cache))
+            except Exception:
+                continue
+            kids.add(public_key.key_id())
+            if len(kids) >= self.required:
+                return keys
+
+        raise jsonsign.JSONSignError("{} of {} required signatures verified".format(len(kids), self.required))
+
+
+def all_of(trusted_kids=None):
+    return Policy(trusted_kids=trusted_kids)
+
+
+def any_of(trusted_kids=None):
+    return Policy(required=1, trusted_kids=trusted_kids)
+
+
+def quorum(required, trusted_kids=None):
+    return Policy(required=required, trusted_kids=trusted_kids)
@@ -2,25 +2,26 @@ from __future__ import unicode_literals
 
 import copy
 
-from cryptography import utils as cry_utils
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives import padding
 from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.asymmetric import utils as asy_utils
 
 from . import hash as hash_
 from . import key
+from . import trace
 from . import util
 
-__all__ = ['RSAPublicKey', 'RSAPrivateKey']
+__all__ = ['RSAPublicKey', 'RSAPrivateKey', 'generate_private_key']
 
 PublicKey = key.PublicKey
 PrivateKey = key.PrivateKey
 
 
 class RSAKey(object):
+    __slots__ = ('_key', '_fingerprint', '_key_id')
+
     @property
     def key(self):
         return self._key
@@ -28,7 +29,13 @@ class RSAKey(object):
     @key.setter
     def key(self, value):
         self._key = value
-        self.numbers = self._numbers()
+        self._fingerprint = None
+        self._key_id = None
+
+    @property
+    def numbers(self):
+        """The key's `cryptography` numbers, computed on every access."""
+        return self._numbers()
 
     def _numbers(self):
         raise NotImplementedError()
@@ -36,21 +43,38 @@ class RSAKey(object):
     def key_type(self):
         return 'RSA'
 
+    def fingerprint(self):
+        if self._fingerprint is None:
+            der_bytes = self.crypto_public_key().public_bytes(
+                serialization.Encoding.DER,
+                serialization.PublicFormat.SubjectPublicKeyInfo
+            )
+            hasher = hashes.Hash(hashes.SHA256(), default_backend())
+            hasher.update(der_bytes)
+            self._fingerprint = hasher.finalize()
+        return self._fingerprint
+
     def key_id(self):
-        der_bytes = self.crypto_public_key().public_bytes(
-            serialization.Encoding.DER,
-            serialization.PublicFormat.SubjectPublicKeyInfo
-        )
-        hasher = hashes.Hash(hashes.SHA256(), default_backend())
-        hasher.update(der_bytes)
-        hash_bytes = hasher.finalize()
-        return util.key_id_encode(hash_bytes[:30])
+        if self._key_id is None:
+            self._key_id = util.key_id_encode(self.fingerprint()[:30])
+        return self._key_id
 
     def __eq__(self, other):
-        return self.crypto_public_key().public_numbers() == other.crypto_public_key().public_numbers()
+        if not isinstance(other, PublicKey):
+            return NotImplemented
+        return self.fingerprint() == other.fingerprint()
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return hash(self.fingerprint())
 
 
 class RSAPublicKey(RSAKey, PublicKey):
+    __slots__ = ()
+
     def __init__(self, public_key):
         self.key = public_key
 
@@ -72,35 +96,39 @@ class RSAPublicKey(RSAKey, PublicKey):
         return copy.copy(self._key)
 
     def to_map(self):
+        numbers = self.numbers
         return {
             'kty': self.key_type(),
             'kid': self.key_id(),
-            'n': util.jose_base64_url_encode(cry_utils.int_to_bytes(self.numbers.n)).decode('utf-8'),
-            'e': util.jose_base64_url_encode(util.serialize_rsa_public_exponent_param(self.numbers.e)).decode('utf-8')
+            'n': util.jose_base64_url_encode(util.int_to_bytes(numbers.n)).decode('utf-8'),
+            'e': util.jose_base64_url_encode(util.serialize_rsa_public_exponent_param(numbers.e)).decode('utf-8')
         }
 
     def verify(self, buffer, alg, signature):
-        sig_alg = hash_.rsa_signature_algorithm_by_name(alg)
-        verifier = self.key.verifier(
-            signature,
-            padding.PKCS1v15(),
-            sig_alg.hasher()
-        )
-        while True:
-            d = buffer.read(1024).encode()
-            if not d:
-                break
-            verifier.update(d)
+        sig_alg = hash_.signature_algorithm_by_name(alg, self.key_type())
+        started = trace.start()
+        digest = util.digest_buffer(buffer, sig_alg.hasher())
+        trace.finish(started, trace.DIGEST, self, alg, buffer)
 
+        started = trace.start()
         try:
-            verifier.verify()
+            self.key.verify(
+                signature,
+                digest,
+                sig_alg.padding(),
+                asy_utils.Prehashed(sig_alg.hasher())
+            )
         except Exception as e:
             raise e
+        finally:
+            trace.finish(started, trace.CRYPTO_VERIFY, self, alg)
 
         return True
 
 
 class RSAPrivateKey(RSAKey, PrivateKey):
+    __slots__ = ()
+
     def __init__(self, private_key):
         self.key = private_key
 
@@ -133,38 +161,48 @@ class RSAPrivateKey(RSAKey, PrivateKey):
         return self._key.public_key()
 
     def to_map(self):
+        numbers = self.numbers
         public_key_map = self.public_key().to_map()
         private_key_map = {
-            'd': util.jose_base64_url_encode(cry_utils.int_to_bytes(self.numbers.d)).decode('utf-8'),
-            'p': util.jose_base64_url_encode(cry_utils.int_to_bytes(self.numbers.p)).decode('utf-8'),
-            'q': util.jose_base64_url_encode(cry_utils.int_to_bytes(self.numbers.q)).decode('utf-8'),
-            'dp': util.jose_base64_url_encode(cry_utils.int_to_bytes(self.numbers.dmp1)).decode('utf-8'),
-            'dq': util.jose_base64_url_encode(cry_utils.int_to_bytes(self.numbers.dmq1)).decode('utf-8'),
-            'qi': util.jose_base64_url_encode(cry_utils.int_to_bytes(self.numbers.iqmp)).decode('utf-8'),
+            'd': util.jose_base64_url_encode(util.int_to_bytes(numbers.d)).decode('utf-8'),
+            'p': util.jose_base64_url_encode(util.int_to_bytes(numbers.p)).decode('utf-8'),
+            'q': util.jose_base64_url_encode(util.int_to_bytes(numbers.q)).decode('utf-8'),
+            'dp': util.jose_base64_url_encode(util.int_to_bytes(numbers.dmp1)).decode('utf-8'),
+            'dq': util.jose_base64_url_encode(util.int_to_bytes(numbers.dmq1)).decode('utf-8'),
+            'qi': util.jose_base64_url_encode(util.int_to_bytes(numbers.iqmp)).decode('utf-8'),
         }
         private_key_map.update(public_key_map)
         return private_key_map
 
     def sign(self, buffer, hash_id):
         sig_alg = hash_.rsa_pkcs1v15_signature_algorithm_for_hash_id(hash_id)
-        signer = self.key.signer(
-            padding.PKCS1v15(),
-            sig_alg.hasher()
+        started = trace.start()
+        digest = util.digest_buffer(buffer, sig_alg.hasher())
+        trace.finish(started, trace.DIGEST, self, sig_alg.header_param(), buffer)
+
+        started = trace.start()
+        signature = self.key.sign(
+            digest,
+            sig_alg.padding(),
+            asy_utils.Prehashed(sig_alg.hasher())
         )
-        while True:
-            d = buffer.read(1024).encode('utf-8')
-            if not d:
-                break
-            signer.update(d)
-
-        return signer.finalize(), sig_alg.header_param()
+        trace.finish(started, trace.CRYPTO_SIGN, self, sig_alg.header_param())
+        return signature, sig_alg.header_param()
 
 
 def rsa_public_key_from_map(jwk):
-    nb64url = jwk['n'].encode('utf-8')
-    eb64url = jwk['e'].encode('utf-8')
+    n_bytes, e_bytes = util.jose_base64_url_decode_many((jwk['n'], jwk['e']))
 
-    n = util.parse_rsa_modules_params(nb64url)
-    e = util.parse_rsa_public_exponent_param(eb64url)
+    n = util.int_from_bytes(n_bytes)
+    e = util.int_from_bytes(e_bytes)
     public_key = rsa.RSAPublicNumbers(e, n).public_key(default_backend())
     return RSAPublicKey(public_key)
+
+
+def generate_private_key(bits=2048, public_exponent=65537):
+    """Generate a new RSA private key with a modulus of `bits` bits."""
+    private_key = rsa.generate_private_key(public_exponent, bits, default_backend())
+    return RSAPrivateKey(private_key)
+
+
+key.register_key_type('RSA', rsa_public_key_from_map, ('n', 'e'))
@@ -0,0 +1,96 @@
+from __future__ import unicode_literals
+
+import multiprocessing
+import os
+import time
+
+from . import hash as hash_
+from . import util
+
+__all__ = ['SigningPool']
+
+# The private key loaded by `_init_worker` in each worker process
+_worker_key = None
+
+
+def _init_worker(key_class, pem_data):
+    global _worker_key
+    _worker_key = key_class.from_pem(pem_data)
+
+
+def _sign(args):
+    data, hash_id = args
+    return _worker_key.sign(data, hash_id)
+
+
+def _ping(delay):
+    # A worker only runs tasks once its initializer has loaded the key
+    time.sleep(delay)
+    return os.getpid()
+
+
+class SigningPool(object):
+    """Sign on a pool of processes that each load the private key once.
+
+    The PEM encoded key is handed to the workers when they start, after that
+    only the bytes to sign and the `(signature, alg)` results cross the
+    process boundary. The pool has the `sign`/`public_key` methods of a
+    private key, so it can be passed to `JSONSignature.sign`.
+    """
+
+    def __init__(self, private_key, processes=None, warm_up=True, maxtasksperchild=None, context=None):
+        context = context or multiprocessing
+        self.processes = processes or multiprocessing.cpu_count()
+        self._public_key = private_key.public_key()
+        self._pool = context.Pool(
+            self.processes,
+            initializer=_init_worker,
+            initargs=(type(private_key), private_key.pem_block()),
+            maxtasksperchild=maxtasksperchild
+        )
+        if warm_up:
+            self.warm_up()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def warm_up(self, timeout=30, delay=0.01):
+        """Wait until every worker has started and loaded the key.
+
+        Returns the number of workers seen ready before `timeout` seconds.
+        """
+        ready = set()
+        deadline = time.time() + timeout
+        while len(ready) < self.processes and time.time() < deadline:
+            ready.update(self._pool.map(_ping, [delay] * self.processes, chunksize=1))
+            delay *= 2
+        return len(ready)
+
+    def public_key(self):
+        return self._public_key
+
+    def key_id(self):
+        return self._public_key.key_id()
+
+    def sign_async(self, buffer, hash_id=hash_.HashID.SHA256):
+        data = b''.join(util.iter_buffer(buffer))
+        return self._pool.apply_async(_sign, ((data, hash_id),))
+
+    def sign(self, buffer, hash_id=hash_.HashID.SHA256):
+        return self.sign_async(buffer, hash_id=hash_id).get()
+
+    def sign_many(self, buffers, hash_id=hash_.HashID.SHA256, chunksize=1):
+        """Sign every buffer and return their `(signature, alg)` in order."""
+        tasks = ((b''.join(util.iter_buffer(buffer)), hash_id) for buffer in buffers)
+        return self._pool.map(_sign, tasks, chunksize=chunksize)
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self):
+        self._pool.terminate()
+        self._pool.join()
@@ -0,0 +1,90 @@
+from __future__ import unicode_literals
+
+import collections
+import threading
+import time
+import timeit
+
+import six
+
+__all__ = ['TraceEvent', 'add_hook', 'remove_hook', 'start', 'finish']
+
+TraceEvent = collections.namedtuple('TraceEvent', ('phase', 'key_type', 'algorithm', 'payload_size', 'elapsed_ns'))
+
+# Phases reported by the library
+PARSE_JSON = 'parse.json'
+DECODE_PAYLOAD = 'parse.payload'
+PARSE_JWK = 'parse.jwk'
+PROTECTED_HEADER = 'sign.protected_header'
+SIGN = 'sign'
+VERIFY = 'verify'
+DECODE_SIGNATURE = 'verify.decode_signature'
+DIGEST = 'crypto.digest'
+CRYPTO_SIGN = 'crypto.sign'
+CRYPTO_VERIFY = 'crypto.verify'
+
+if hasattr(time, 'perf_counter_ns'):
+    clock_ns = time.perf_counter_ns
+else:
+    def clock_ns():
+        return int(timeit.default_timer() * 1e9)
+
+# Replaced as a whole under `_lock`, read without locking
+_hooks = ()
+_lock = threading.Lock()
+
+
+def add_hook(hook):
+    """Register `hook`, called with a `TraceEvent` at the end of every phase.
+
+    Hooks run synchronously on the thread doing the work and must be cheap
+    and thread-safe.
+    """
+    global _hooks
+    with _lock:
+        _hooks = _hooks + (hook,)
+
+
+def remove_hook(hook):
+    global _hooks
+    with _lock:
+        _hooks = tuple(h for h in _hooks if h != hook)
+
+
+def start():
+    """Return the start time of a phase, or `None` when no hook is registered."""
+    if not _hooks:
+        return None
+    return clock_ns()
+
+
+def finish(started, phase, key=None, algorithm=None, payload=None):
+    """Report a phase begun at `started`; `key` is the key (or the `kty`) and
+    `payload` what it worked on, they are only looked at when a hook is
+    registered and only the key type and payload size are reported."""
+    if started is None:
+        return
+    elapsed_ns = clock_ns() - started
+    event = TraceEvent(phase, key_type(key), algorithm, None if payload is None else buffer_size(payload), elapsed_ns)
+    for hook in _hooks:
+        hook(event)
+
+
+def key_type(key):
+    if key is None or isinstance(key, six.string_types):
+        return key
+    if hasattr(key, 'key_type'):
+        return key.key_type()
+    # Signers such as `signpool.SigningPool` only expose their public key
+    return key.public_key().key_type()
+
+
+def buffer_size(buffer):
+    """Length of a sign/verify buffer, `None` for file-like objects."""
+    if isinstance(buffer, int):
+        return buffer
+    if isinstance(buffer, (list, tuple)):
+        return sum(len(part) for part in buffer)
+    if hasattr(buffer, 'read'):
+        return None
+    return len(buffer)
@@ -1,11 +1,15 @@
 from __future__ import unicode_literals
 
 import base64
+import binascii
 import datetime
 import json
+import string
 import time
 
-from cryptography import utils as cry_utils
+import six
+
+READ_CHUNK_SIZE = 64 * 1024
 
 
 def key_id_encode(hash_bytes):
@@ -18,24 +22,144 @@ def key_id_encode(hash_bytes):
     return result
 
 
+_maketrans = bytes.maketrans if six.PY3 else string.maketrans
+
+# base64url to standard base64 alphabet and back, `=` padding is deleted in the same pass
+_TO_STANDARD = _maketrans(b'-_', b'+/')
+_TO_URLSAFE = _maketrans(b'+/', b'-_')
+
+# Characters ignored in base64url input
+_IGNORED = b' \n'
+
+_URLSAFE_ALPHABET = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'
+
+_PADDING = (b'', None, b'==', b'=')
+
+try:
+    binascii.a2b_base64(b'', strict_mode=True)
+    _A2B_OPTIONS = {'strict_mode': True}
+except TypeError:
+    # Before Python 3.11 characters outside the alphabet are skipped
+    _A2B_OPTIONS = {}
+
+
 def jose_base64_url_encode(data):
-    return base64.urlsafe_b64encode(data).rstrip(b'=')
+    return base64.b64encode(data).translate(_TO_URLSAFE, b'=')
+
+
+class JoseBase64URLEncoder(object):
+    """Incrementally base64url encode data into a bytearray, without padding.
+
+    Input is encoded in multiples of 3 bytes as it arrives, so the encoded
+    output is the only full size buffer.
+    """
+
+    def __init__(self):
+        self.output = bytearray()
+        self._pending = b''
+
+    def update(self, data):
+        if self._pending:
+            data = self._pending + data
+        cut = len(data) - len(data) % 3
+        self.output += base64.urlsafe_b64encode(data[:cut])
+        self._pending = data[cut:]
+
+    def finalize(self):
+        if self._pending:
+            self.output += base64.urlsafe_b64encode(self._pending).rstrip(b'=')
+            self._pending = b''
+        return self.output
+
+
+def _to_standard_base64(data):
+    if isinstance(data, six.text_type):
+        data = data.encode('ascii')
+    data = data.translate(_TO_STANDARD, _IGNORED)
+    padding = _PADDING[len(data) % 4]
+    if padding is None:
+        raise binascii.Error("invalid base64url length {}".format(len(data)))
+    return data + padding
 
 
 def jose_base64_url_decode(data):
-    data = data.replace(b'\n', b'')
-    data = data.replace(b' ', b'')
-    # illegal when data % 4 == 1
-    data += {
-        0: b'',
-        2: b'==',
-        3: b'='
-    }[len(data) % 4]
-    return base64.urlsafe_b64decode(data)
+    """Decode unpadded base64url bytes (or ASCII text).
+
+    The decoder is lenient: whitespace, `+`, `/` and non-zero trailing bits
+    are accepted, use `is_canonical_base64_url` to tell such input apart.
+    """
+    return binascii.a2b_base64(_to_standard_base64(data), **_A2B_OPTIONS)
+
+
+def is_canonical_base64_url(data):
+    """Whether `data` is exactly what `jose_base64_url_encode` produces for its decoded value."""
+    if data.translate(None, _URLSAFE_ALPHABET) or len(data) % 4 == 1:
+        return False
+    tail = data[len(data) - len(data) % 4:]
+    return jose_base64_url_encode(jose_base64_url_decode(tail)) == tail
+
+
+def jose_base64_url_decode_many(items):
+    """Decode a sequence of base64url values, such as the members of a JWK.
+
+    Every value must be valid; each one is padded separately, as padding
+    may only end a base64 input.
+    """
+    a2b_base64 = binascii.a2b_base64
+    return [a2b_base64(_to_standard_base64(data), **_A2B_OPTIONS) for data in items]
+
+
+def iter_buffer(buffer, chunk_size=READ_CHUNK_SIZE):
+    """Yield the bytes to sign or verify from `buffer`.
+
+    `buffer` is a file-like object (text is encoded as UTF-8), a bytes-like
+    object, or a list/tuple of bytes-like parts that are used in order
+    without being joined.
+    """
+    if hasattr(buffer, 'read'):
+        while True:
+            d = buffer.read(chunk_size)
+            if not d:
+                break
+            if isinstance(d, six.text_type):
+                d = d.encode('utf-8')
+            yield d
+    elif isinstance(buffer, (list, tuple)):
+        for part in buffer:
+            yield part
+    else:
+        yield buffer
+
+
+def digest_buffer(buffer, hash_algorithm):
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives import hashes
+
+    hasher = hashes.Hash(hash_algorithm, default_backend())
+    for d in iter_buffer(buffer):
+        hasher.update(d)
+    return hasher.finalize()
+
+
+if hasattr(int, 'from_bytes'):
+    def int_from_bytes(data):
+        return int.from_bytes(data, 'big')
+
+    def int_to_bytes(integer, length=None):
+        return integer.to_bytes(length or (integer.bit_length() + 7) // 8 or 1, 'big')
+else:
+    def int_from_bytes(data):
+        return int(binascii.hexlify(data), 16) if data else 0
+
+    def int_to_bytes(integer, length=None):
+        hex_string = '%x' % integer
+        n = len(hex_string)
+        data = binascii.unhexlify(hex_string.zfill(n + (n & 1)))
+        return data.rjust(length or len(data), b'\x00')
 
 
 def serialize_rsa_public_exponent_param(e):
-    return cry_utils.int_to_bytes(e).lstrip(b'\x00')
+    return int_to_bytes(e).lstrip(b'\x00')
 
 
 def dump_json(data, **kwargs):
@@ -46,22 +170,22 @@ def dump_json(data, **kwargs):
 
 def parse_rsa_modules_params(nb64url):
     n_bytes = jose_base64_url_decode(nb64url)
-    return cry_utils.int_from_bytes(n_bytes, 'big')
+    return int_from_bytes(n_bytes)
 
 
 def parse_rsa_public_exponent_param(eb64url):
     e_bytes = jose_base64_url_decode(eb64url)
     e_bytes = b'\x00' * (4 - len(e_bytes)) + e_bytes
-    return cry_utils.int_from_bytes(e_bytes, 'big')
+    return int_from_bytes(e_bytes)
 
 
 def parse_ec_coordinate(cb64url, curve):
-    curve_byte_len = (curve.bit_size() + 7) >> 3
+    curve_byte_len = curve.octet_length()
     c_bytes = jose_base64_url_decode(cb64url)
 
     if len(c_bytes) != curve_byte_len:
         raise Exception("invalid number of octets: got %d, should be %d", len(c_bytes), curve_byte_len)
-    return cry_utils.int_from_bytes(c_bytes, 'big')
+    return int_from_bytes(c_bytes)
 
 
 def utc_rfc3339(timestamp=None):
@@ -10,6 +10,7 @@ install_requires = [
     'enum34>=1.1.6',
     'cryptography>=1.9',
     'six>=1.4.1',
+    'futures>=3.0.5; python_version < "3"',
 ]
 
 setup(
@@ -19,5 +20,8 @@ setup(
     url='https://github.com/realityone/libtrust-py',
     packages=['libtrust'],
     install_requires=install_requires,
+    entry_points={
+        'console_scripts': ['libtrust = libtrust.cli:main'],
+    },
     zip_safe=False,
 )
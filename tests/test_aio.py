@@ -0,0 +1,109 @@
+from __future__ import unicode_literals
+
+import threading
+import unittest
+from concurrent import futures
+
+import six
+
+from libtrust import ec_key
+from libtrust import jsonsign
+from libtrust import pipeline
+from libtrust import rsa_key
+from tests import fixtures_path
+
+if six.PY3:
+    import asyncio
+
+    from libtrust import aio
+
+
+@unittest.skipIf(six.PY2, "asyncio is Python 3 only")
+class AIOTest(unittest.TestCase):
+    def setUp(self):
+        with open(fixtures_path('private.pem'), 'r') as f:
+            self.rsa_private_key = rsa_key.RSAPrivateKey.from_pem(f.read().encode())
+        with open(fixtures_path('ec-private.pem'), 'r') as f:
+            self.ec_private_key = ec_key.ECPrivateKey.from_pem(f.read().encode())
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_coroutine(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_sign_verify_parse(self):
+        js = jsonsign.JSONSignature.from_map({'hello': '123'})
+        self.run_coroutine(aio.sign(js, self.rsa_private_key, timestamp=1478423072))
+        parsed = self.run_coroutine(aio.parse_jws(js.jws()))
+        self.assertEqual([self.rsa_private_key.public_key()], self.run_coroutine(aio.verify(parsed)))
+
+    def test_sign_many(self):
+        js = jsonsign.JSONSignature.from_map({'hello': '123'})
+        runner = aio.Runner(executor=futures.ThreadPoolExecutor(2), max_concurrency=1)
+        results = self.run_coroutine(runner.sign_many(js, [self.rsa_private_key, self.ec_private_key]))
+        self.assertEqual(['RS256', 'ES256'], [algorithm for _, algorithm in results])
+        self.assertEqual([self.rsa_private_key.public_key(), self.ec_private_key.public_key()], js.verify())
+
+    def test_cancel_releases_slot(self):
+        release = threading.Event()
+        executor = futures.ThreadPoolExecutor(2)
+        runner = aio.Runner(executor=executor, max_concurrency=1)
+
+        slow = self.loop.create_task(runner.run(release.wait))
+        self.run_coroutine(asyncio.sleep(0.01))
+        slow.cancel()
+        self.assertEqual(3, self.run_coroutine(asyncio.wait_for(runner.run(lambda: 3), 5)))
+        self.assertTrue(slow.cancelled())
+        release.set()
+        executor.shutdown()
+
+    def test_runner_across_loops(self):
+        runner = aio.Runner(executor=futures.ThreadPoolExecutor(2), max_concurrency=1)
+        for _ in range(2):
+            loop = asyncio.new_event_loop()
+            try:
+                # Two jobs for one slot, so the second one waits on the semaphore
+                tasks = [loop.create_task(runner.run(lambda: 1)), loop.create_task(runner.run(lambda: 2))]
+                results = loop.run_until_complete(asyncio.gather(*tasks))
+            finally:
+                loop.close()
+            self.assertEqual([1, 2], results)
+        runner.executor.shutdown()
+
+    def collect(self, results):
+        # Consumes an async iterator without `async for`, which Python 2 can not parse
+        collected = []
+        while True:
+            try:
+                collected.append(self.run_coroutine(results.__anext__()))
+            except StopAsyncIteration:
+                return collected
+
+    def test_verify_stream(self):
+        js = jsonsign.JSONSignature.from_map({'hello': '123'})
+        js.sign(self.ec_private_key)
+        jws = js.jws()
+
+        results = self.collect(aio.verify_stream(AsyncDocuments([jws, '{}', jws])))
+        self.assertEqual([0, 1, 2], [result.index for result in results])
+        self.assertEqual([False, True, False], [result.error is not None for result in results])
+
+        unordered = pipeline.Pipeline(max_in_flight=1, ordered=False)
+        results = self.collect(aio.verify_stream([jws] * 5, pipeline=unordered))
+        self.assertEqual([[self.ec_private_key.public_key()]] * 5, [result.keys for result in results])
+
+
+class AsyncDocuments(object):
+    def __init__(self, documents):
+        self.documents = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        try:
+            return asyncio.sleep(0, result=next(self.documents))
+        except StopIteration:
+            raise StopAsyncIteration
@@ -0,0 +1,70 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from cryptography.exceptions import InvalidSignature
+
+from libtrust import batch
+from libtrust import ec_key
+from libtrust import jsonsign
+from libtrust import rsa_key
+from tests import fixtures_path
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        with open(fixtures_path('private.pem'), 'r') as f:
+            self.rsa_private_key = rsa_key.RSAPrivateKey.from_pem(f.read().encode())
+        with open(fixtures_path('ec-private.pem'), 'r') as f:
+            self.ec_private_key = ec_key.ECPrivateKey.from_pem(f.read().encode())
+
+    def create_js(self, content, *private_keys):
+        js = jsonsign.JSONSignature.from_map(content)
+        for private_key in private_keys:
+            js.sign(private_key, timestamp=1478423072)
+        return js
+
+    def create_items(self):
+        tampered = self.create_js({'hello': '123'}, self.rsa_private_key)
+        tampered.payload = self.create_js({'hello': '456'}).payload
+        return [
+            self.create_js({'hello': '123'}, self.rsa_private_key),
+            self.create_js({'hello': '123'}, self.ec_private_key, self.rsa_private_key),
+            tampered,
+        ]
+
+    def check_results(self, results):
+        self.assertEqual(3, len(results))
+        self.assertEqual([self.rsa_private_key.public_key()], results[0].keys)
+        self.assertIsNone(results[0].error)
+        self.assertEqual(
+            sorted([self.ec_private_key.key_id(), self.rsa_private_key.key_id()]),
+            sorted(key.key_id() for key in results[1].keys)
+        )
+        self.assertEqual([], results[2].keys)
+        self.assertIsInstance(results[2].error, InvalidSignature)
+
+    def test_verify_many_threads(self):
+        self.check_results(batch.verify_many(self.create_items(), max_workers=2))
+
+    def test_verify_many_jws(self):
+        items = [js.jws() for js in self.create_items()]
+        self.check_results(batch.verify_many(items, max_workers=2))
+
+    def test_verify_many_processes(self):
+        self.check_results(batch.verify_many(self.create_items(), max_workers=2, processes=True))
+
+    def test_verify_many_unsigned(self):
+        for processes in (False, True):
+            items = [
+                self.create_js({'hello': '123'}),
+                self.create_js({'hello': '123'}, self.ec_private_key, self.rsa_private_key),
+            ]
+            # The reverse of the order `jws()` sorts them in
+            items[1].signatures.sort(key=lambda sign: sign.header.public_key().key_id(), reverse=True)
+            signatures = list(items[1].signatures)
+            results = batch.verify_many(items, max_workers=2, processes=processes)
+            self.assertEqual(batch.BatchResult([], None), results[0])
+            self.assertEqual(2, len(results[1].keys))
+            self.assertIsNone(results[1].error)
+            self.assertEqual(signatures, items[1].signatures)
@@ -0,0 +1,122 @@
+from __future__ import unicode_literals
+
+import json
+import threading
+import unittest
+
+from libtrust import cache
+from libtrust import jsonsign
+from libtrust import key
+from libtrust import rsa_key
+from libtrust import util
+from tests import fixtures_path
+
+
+class LRUCacheTest(unittest.TestCase):
+    def test_eviction(self):
+        lru = cache.LRUCache(maxsize=2)
+        lru.put('a', 1)
+        lru.put('b', 2)
+        self.assertEqual(1, lru.get('a'))
+        lru.put('c', 3)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(1, lru.get('a'))
+        self.assertEqual(3, lru.get('c'))
+        self.assertEqual(cache.CacheInfo(3, 1, 2, 2), lru.info())
+
+    def test_disabled(self):
+        lru = cache.LRUCache(maxsize=0)
+        self.assertEqual(1, lru.get_or_create('a', lambda: 1))
+        self.assertEqual(0, len(lru))
+
+    def test_resize(self):
+        lru = cache.LRUCache(maxsize=None)
+        for i in range(10):
+            lru.put(i, i)
+        lru.resize(3)
+        self.assertEqual([7, 8, 9], [k for k in range(10) if k in lru])
+
+
+class JWKCacheTest(unittest.TestCase):
+    def setUp(self):
+        key.jwk_cache.clear()
+        with open(fixtures_path('public.pem'), 'r') as f:
+            self.public_key = rsa_key.RSAPublicKey.from_pem(f.read().encode())
+
+    def test_shared_key(self):
+        jwk = json.loads(self.public_key.marshal_json())
+        first = key.parse_public_key_jwk(jwk)
+        second = key.parse_public_key_jwk(dict(jwk))
+        self.assertIs(first, second)
+        self.assertEqual((1, 1), key.jwk_cache.info()[:2])
+        self.assertIsNot(first, key.parse_public_key_jwk(jwk, use_cache=False))
+
+
+class VerifyCacheTest(unittest.TestCase):
+    def setUp(self):
+        with open(fixtures_path('private.pem'), 'r') as f:
+            self.private_key = rsa_key.RSAPrivateKey.from_pem(f.read().encode())
+        js = jsonsign.JSONSignature.from_map({'hello': '123'})
+        js.sign(self.private_key, timestamp=1478423072)
+        self.jws = js.jws()
+        self.now = 1000
+        self.verify_cache = cache.VerifyCache(maxsize=8, ttl=60, negative_ttl=5, clock=lambda: self.now)
+
+    def parse(self):
+        return jsonsign.JSONSignature.parse_jws(self.jws)
+
+    def test_hit(self):
+        keys = self.parse().verify(cache=self.verify_cache)
+        self.assertEqual([self.private_key.public_key()], keys)
+        self.assertEqual(1, len(self.verify_cache))
+        self.assertIs(keys[0], self.parse().verify(cache=self.verify_cache)[0])
+        self.assertEqual((1, 1), self.verify_cache.info()[:2])
+
+        self.now += 60
+        self.assertEqual(keys, self.parse().verify(cache=self.verify_cache))
+        self.assertEqual((1, 2), self.verify_cache.info()[:2])
+
+    def test_negative(self):
+        js = self.parse()
+        js.payload = util.jose_base64_url_encode(b'{"hello": "456"}')
+        self.assertRaises(Exception, js.verify, cache=self.verify_cache)
+        self.assertEqual(1, len(self.verify_cache))
+        self.assertRaises(Exception, js.verify, cache=self.verify_cache)
+        self.assertEqual((1, 1), self.verify_cache.info()[:2])
+
+        self.now += 5
+        self.assertRaises(Exception, js.verify, cache=self.verify_cache)
+        self.assertEqual((1, 2), self.verify_cache.info()[:2])
+
+    def test_negative_new_error(self):
+        js = self.parse()
+        js.payload = util.jose_base64_url_encode(b'{"hello": "456"}')
+        errors = []
+        for _ in range(3):
+            try:
+                js.verify(cache=self.verify_cache)
+            except Exception as e:
+                errors.append(e)
+        self.assertEqual(1, len(set(type(e) for e in errors)))
+        self.assertEqual(3, len(set(id(e) for e in errors)))
+
+    def test_concurrent_counts(self):
+        self.parse().verify(cache=self.verify_cache)
+        key = list(self.verify_cache._results._data)[0]
+
+        def get():
+            for _ in range(1000):
+                self.verify_cache.get(key)
+                self.verify_cache.get(b'missing')
+
+        threads = [threading.Thread(target=get) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((8000, 8001), self.verify_cache.info()[:2])
+
+    def test_key(self):
+        key_a = cache.VerifyCache.key('ab', b'c', 'sig', 'kid', 'RS256')
+        self.assertNotEqual(key_a, cache.VerifyCache.key('a', b'bc', 'sig', 'kid', 'RS256'))
+        self.assertEqual(key_a, cache.VerifyCache.key(b'ab', bytearray(b'c'), 'sig', 'kid', 'RS256'))
@@ -0,0 +1,99 @@
+from __future__ import unicode_literals
+
+import datetime
+import unittest
+
+from cryptography import x509
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from cryptography.x509.oid import NameOID
+
+from libtrust import certificates
+from libtrust import jsonsign
+from libtrust import rsa_key
+from tests import fixtures_path
+
+
+def create_certificate(common_name, public_key, issuer_name, issuer_key, ca, algorithm=hashes.SHA256()):
+    now = datetime.datetime.utcnow()
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)])
+    return x509.CertificateBuilder().subject_name(
+        name
+    ).issuer_name(
+        issuer_name or name
+    ).public_key(
+        public_key
+    ).serial_number(
+        x509.random_serial_number()
+    ).not_valid_before(
+        now - datetime.timedelta(days=1)
+    ).not_valid_after(
+        now + datetime.timedelta(days=1)
+    ).add_extension(
+        x509.BasicConstraints(ca=ca, path_length=None), critical=True
+    ).sign(issuer_key, algorithm, default_backend())
+
+
+class CertificatesTest(unittest.TestCase):
+    def setUp(self):
+        with open(fixtures_path('private.pem'), 'r') as f:
+            self.private_key = rsa_key.RSAPrivateKey.from_pem(f.read().encode())
+
+        self.root_key = root_key = ec.generate_private_key(ec.SECP256R1(), default_backend())
+        intermediate_key = ec.generate_private_key(ec.SECP256R1(), default_backend())
+        self.root = create_certificate('root', root_key.public_key(), None, root_key, True)
+        self.intermediate = create_certificate('intermediate', intermediate_key.public_key(), self.root.subject,
+                                               root_key, True)
+        self.leaf = create_certificate('leaf', self.private_key.crypto_public_key(), self.intermediate.subject,
+                                       intermediate_key, False)
+
+        self.js = jsonsign.JSONSignature.from_map({'hello': '123'})
+        self.js.sign_with_chain(self.private_key, [self.leaf, self.intermediate], timestamp=1478423072)
+
+    def test_verify(self):
+        self.assertEqual([self.private_key.public_key()], self.js.verify())
+
+        parsed = jsonsign.JSONSignature.parse_jws(self.js.jws())
+        self.assertNotIn('jwk', parsed.signatures[0].header.json())
+        verifier = certificates.ChainVerifier(certificates.CertPool([self.root]))
+        self.assertEqual([self.private_key.public_key()], parsed.verify(chain_verifier=verifier))
+        self.assertEqual([[self.leaf, self.intermediate, self.root]], parsed.verify_chains(verifier))
+        self.assertEqual((1, 1), verifier.chain_cache.info()[:2])
+
+    def test_unknown_authority(self):
+        other_key = ec.generate_private_key(ec.SECP256R1(), default_backend())
+        other_root = create_certificate('root', other_key.public_key(), None, other_key, True)
+        verifier = certificates.ChainVerifier(certificates.CertPool([other_root]))
+        self.assertRaises(certificates.CertificateError, self.js.verify, chain_verifier=verifier)
+        self.assertEqual(0, len(verifier.chain_cache))
+
+    def test_expired(self):
+        verifier = certificates.ChainVerifier(certificates.CertPool([self.root]))
+        verifier.verify(self.js.signatures[0].header.chain)
+        verifier.clock = lambda: 0
+        self.assertRaises(certificates.CertificateError, verifier.verify, self.js.signatures[0].header.chain)
+
+    def test_leaf_not_ca(self):
+        leaf_key = ec.generate_private_key(ec.SECP256R1(), default_backend())
+        child = create_certificate('child', leaf_key.public_key(), self.leaf.subject, leaf_key, False)
+        verifier = certificates.ChainVerifier(certificates.CertPool([self.root]))
+        chain = [certificates.encode_chain_certificate(c) for c in (child, self.leaf, self.intermediate)]
+        self.assertRaises(certificates.CertificateError, verifier.verify, chain)
+
+    def test_unsupported_key_type(self):
+        ed_key = ed25519.Ed25519PrivateKey.generate()
+        ed_intermediate = create_certificate('ed25519', ed_key.public_key(), self.root.subject, self.root_key, True)
+        leaf = create_certificate('leaf', self.private_key.crypto_public_key(), ed_intermediate.subject, ed_key, False,
+                                  algorithm=None)
+        js = jsonsign.JSONSignature.from_map({'hello': '123'})
+        js.sign_with_chain(self.private_key, [leaf, ed_intermediate])
+        # The intermediate's key is only needed to check the chain
+        self.assertEqual([self.private_key.public_key()], js.verify())
+        verifier = certificates.ChainVerifier(certificates.CertPool([self.root]))
+        self.assertRaises(certificates.CertificateError, js.verify, chain_verifier=verifier)
+
+        js = jsonsign.JSONSignature.from_map({'hello': '123'})
+        js.sign_with_chain(self.private_key, [ed_intermediate])
+        self.assertRaises(certificates.CertificateError, js.verify)
@@ -0,0 +1,102 @@
+from __future__ import unicode_literals
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import six
+
+from libtrust import cli
+from libtrust import jsonsign
+from libtrust import rsa_key
+from libtrust import util
+from tests import fixtures_path
+
+
+class CLITest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        for i in range(3):
+            with io.open(os.path.join(self.directory, 'manifest-{}.json'.format(i)), 'w') as f:
+                f.write('{\n   "name": "manifest-%d"\n}' % i)
+        with open(fixtures_path('private.pem'), 'rb') as f:
+            self.private_key = rsa_key.RSAPrivateKey.from_pem(f.read())
+
+    def main(self, argv, stdin=''):
+        stdout = io.StringIO()
+        status = cli.main(argv, stdin=io.StringIO(stdin), stdout=stdout)
+        return status, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_sign_and_verify(self):
+        signed = os.path.join(self.directory, 'signed')
+        os.mkdir(signed)
+        pattern = os.path.join(self.directory, '*.json')
+        argv = ['sign', '--jobs', '2', '--key', fixtures_path('private.pem'), '-o', signed, pattern]
+        status, results = self.main(argv)
+        self.assertEqual(0, status)
+        self.assertEqual(sorted(os.listdir(signed)), [os.path.basename(result['output']) for result in results])
+        self.assertTrue(all(result['kid'] == self.private_key.key_id() for result in results))
+
+        status, results = self.main(['verify', '--jobs', '1', signed])
+        self.assertEqual(0, status)
+        self.assertEqual([[self.private_key.key_id()]] * 3, [result['keys'] for result in results])
+        self.assertTrue(all(result['elapsed_ms'] >= 0 for result in results))
+
+    def test_output_paths(self):
+        for name in ('a', 'b'):
+            os.mkdir(os.path.join(self.directory, name))
+            with io.open(os.path.join(self.directory, name, 'manifest.json'), 'w') as f:
+                f.write('{"name": "%s"}' % name)
+        signed = os.path.join(self.directory, 'signed')
+        argv = ['sign', '-j', '1', '-k', fixtures_path('ec-private.pem'), '-o', signed]
+
+        cwd = os.getcwd()
+        os.chdir(self.directory)
+        self.addCleanup(os.chdir, cwd)
+        status, results = self.main(argv + [os.path.join('a', 'manifest.json'), os.path.join('b', 'manifest.json')])
+        self.assertEqual(0, status)
+        self.assertEqual([os.path.join(signed, name, 'manifest.json') for name in ('a', 'b')],
+                         [result['output'] for result in results])
+
+        # Outside the current directory only the file names are kept, the second one may not overwrite the first
+        os.chdir(signed)
+        inputs = [os.path.join(self.directory, name, 'manifest.json') for name in ('a', 'b')]
+        status, results = self.main(argv + inputs)
+        self.assertEqual(1, status)
+        self.assertEqual([True, False], [result['ok'] for result in results])
+        self.assertIn(inputs[0], results[1]['error'])
+
+    def test_stdin(self):
+        argv = ['sign', '-j', '1', '-k', fixtures_path('ec-private.pem')]
+        status, results = self.main(argv, '{"a": 1}\n\n{"b": 2}\n')
+        self.assertEqual(['-:1', '-:3'], [result['source'] for result in results])
+
+        stdin = ''.join(json.dumps(json.loads(result['jws'])) + '\n' for result in results)
+        stdin += '{"payload": "e30", "signatures": []}\n'
+        status, results = self.main(['verify', '-j', '1', '-'], stdin)
+        self.assertEqual(1, status)
+        self.assertEqual([True, True, False], [result['ok'] for result in results])
+        self.assertIn('JSONSignError', results[2]['error'])
+
+        js = jsonsign.JSONSignature.parse_jws(stdin.splitlines()[0])
+        self.assertEqual(b'{"a": 1}', util.jose_base64_url_decode(js.payload))
+
+    def test_missing_file(self):
+        status, results = self.main(['verify', '-j', '1', os.path.join(self.directory, 'missing.json')])
+        self.assertEqual(1, status)
+        self.assertFalse(results[0]['ok'])
+
+    def test_usage_errors(self):
+        stderr = sys.stderr
+        sys.stderr = io.StringIO() if six.PY3 else io.BytesIO()
+        self.addCleanup(setattr, sys, 'stderr', stderr)
+
+        self.assertRaises(SystemExit, self.main, ['verify', os.path.join(self.directory, '*.missing')])
+        argv = ['sign', '-k', fixtures_path('private.pem'), '--passphrase-env', 'LIBTRUST_TEST_UNSET', '-']
+        os.environ.pop('LIBTRUST_TEST_UNSET', None)
+        self.assertRaises(SystemExit, self.main, argv)
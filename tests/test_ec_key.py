@@ -64,3 +64,43 @@ class ECKeyTest(unittest.TestCase):
 
             message.seek(0)
             self.assertTrue(self.public_key.verify(message, alg, bytes(bytearray(origin_sig[i]))))
+
+    def test_sign_bytes(self):
+        message = b'Hello, World!'
+        sig, alg = self.private_key.sign(message, hash_.HashID.SHA256)
+        self.assertTrue(self.public_key.verify(six.StringIO(u'Hello, World!'), alg, sig))
+        self.assertTrue(self.public_key.verify(memoryview(message), alg, sig))
+        self.assertTrue(self.public_key.verify((b'Hello', b', ', bytearray(b'World!')), alg, sig))
+
+    def test_equal_and_hash(self):
+        self.assertEqual(self.public_key, self.private_key.public_key())
+        self.assertEqual(self.public_key, self.private_key)
+        self.assertNotEqual(self.public_key, object())
+        self.assertEqual(1, len({self.public_key, self.private_key.public_key()}))
+        self.assertIs(self.public_key.key_id(), self.public_key.key_id())
+
+    def test_register_curve(self):
+        from cryptography.hazmat.backends import default_backend
+        from cryptography.hazmat.primitives.asymmetric import ec
+
+        from libtrust import key
+
+        es256k = hash_.SignatureAlgorithm('ES256K', hash_.HashID.SHA256, 'EC')
+        curve = ec_key.register_curve('secp256k1', ec.SECP256K1, es256k, 256)
+        self.addCleanup(ec_key.unregister_curve, 'secp256k1')
+        private_key = ec_key.ECPrivateKey(ec.generate_private_key(ec.SECP256K1(), default_backend()))
+        self.assertIs(curve, private_key.curve)
+        self.assertEqual(32, curve.octet_length())
+
+        sig, alg = private_key.sign(b'Hello', hash_.HashID.SHA256)
+        self.assertEqual('ES256K', alg)
+        public_key = key.parse_public_key_jwk(private_key.public_key().to_map())
+        self.assertEqual(private_key.public_key(), public_key)
+        self.assertTrue(public_key.verify(b'Hello', alg, sig))
+        self.assertIs(es256k, hash_.signature_algorithm_by_name('ES256K', 'EC'))
+        self.assertRaises(ValueError, ec_key.curve_by_name, 'P-192')
+
+        self.assertIs(curve, ec_key.unregister_curve('secp256k1'))
+        self.assertRaises(ValueError, ec_key.curve_by_name, 'secp256k1')
+        self.assertRaises(NotImplementedError, hash_.signature_algorithm_by_name, 'ES256K')
+        self.assertRaises(ValueError, ec_key.unregister_curve, 'P-256')
@@ -1,5 +1,7 @@
 from __future__ import unicode_literals
 
+import io
+import json
 import unittest
 
 from libtrust import ec_key
@@ -27,6 +29,15 @@ class JSONSignTest(unittest.TestCase):
         self.assertEqual('eyJmb3JtYXRMZW5ndGgiOjE5LCJmb3JtYXRUYWlsIjoiQ24wIiwidGltZSI6IjIwMTYtMTEtMDZUMDk6MDQ6MzJaIn0',
                          self.create_js().protected_header(timestamp=1478423072).decode('utf-8'))
 
+    def test_detect_json_indent(self):
+        self.assertEqual('   ', jsonsign.detect_json_indent('{\n   "hello": "123"\n}'))
+        self.assertEqual('', jsonsign.detect_json_indent('{"hello":"123"}'))
+
+    def test_sign_bytes(self):
+        js = self.create_js()
+        protected = js.protected_header(timestamp=1478423072)
+        self.assertEqual(protected + b'.' + bytes(js.payload), js.sign_bytes(protected))
+
     def test_sign(self):
         rsa_js = self.create_js()
         rsa_sig_bytes, rsa_algorithm = rsa_js.sign(self.rsa_private_key, timestamp=1478423072)
@@ -218,3 +229,93 @@ class JSONSignTest(unittest.TestCase):
         ).decode('utf-8')
         parsed_ec_js = jsonsign.JSONSignature.parse_jws(origin_ec_jws)
         self.assertEqual(origin_ec_jws, parsed_ec_js.jws())
+
+    def test_parse_jws_non_canonical_payload(self):
+        js = jsonsign.JSONSignature.from_map({'hello': '12'})
+        js.sign(self.rsa_private_key, timestamp=1478423072)
+        payload = js.payload.decode('utf-8')
+        # The last character only carries 4 bits, the next one decodes to the same content
+        tampered = payload[:-1] + chr(ord(payload[-1]) + 1)
+        self.assertEqual(util.jose_base64_url_decode(payload), util.jose_base64_url_decode(tampered))
+
+        jws = js.jws().replace(payload, tampered)
+        parsers = (jsonsign.JSONSignature.parse_jws, lambda jws: jsonsign.JSONSignature.parse_jws_stream(io.StringIO(jws)))
+        for parsed in (parse(jws) for parse in parsers):
+            self.assertEqual(js.payload, parsed.payload)
+            self.assertEqual([self.rsa_private_key.public_key()], parsed.verify())
+
+    def test_parse_jws_stream(self):
+        content = {
+            'hello': '123',
+            'history': ['你好 {}'.format(i) * 20 for i in range(200)]
+        }
+        js = jsonsign.JSONSignature.from_map(content)
+        js.sign(self.rsa_private_key, timestamp=1478423072)
+        js.sign(self.ec_private_key, timestamp=1478423072)
+        jws = js.jws()
+        parsed = jsonsign.JSONSignature.parse_jws(jws)
+
+        for stream in (io.BytesIO(jws.encode('utf-8')), io.StringIO(jws), [jws[i:i + 100] for i in range(0, len(jws), 100)]):
+            streamed = jsonsign.JSONSignature.parse_jws_stream(stream, chunk_size=64)
+            self.assertEqual(js.payload, streamed.payload)
+            self.assertEqual(parsed.indent, streamed.indent)
+            self.assertEqual(parsed.format_length, streamed.format_length)
+            self.assertEqual(parsed.format_tail, streamed.format_tail)
+            self.assertEqual(jws, streamed.jws())
+            self.assertEqual(2, len(streamed.verify()))
+
+        for chunk_size in (4, 8):
+            streamed = jsonsign.JSONSignature.parse_jws_stream(io.StringIO(jws), chunk_size=chunk_size)
+            self.assertEqual(parsed.indent, streamed.indent)
+            self.assertEqual(jws, streamed.jws())
+
+    def test_parse_jws_stream_long_tail(self):
+        for content in ('{"a": 1' + ' ' * 5000 + '}', '{"a": "\u4f60"' + '\n' * 5000 + '}  '):
+            js = jsonsign.JSONSignature.new_json_signature(content)
+            js.sign(self.ec_private_key)
+            parsed = jsonsign.JSONSignature.parse_jws(js.jws())
+            streamed = jsonsign.JSONSignature.parse_jws_stream(io.StringIO(js.jws()), chunk_size=64)
+            self.assertEqual((parsed.format_length, parsed.format_tail), (streamed.format_length, streamed.format_tail))
+
+        js = jsonsign.JSONSignature(util.jose_base64_url_encode(b'{"a": 1,' + b' ' * 5000 + b'}'), '', 8, '}')
+        js.sign(self.ec_private_key)
+        self.assertRaises(jsonsign.JSONSignError, jsonsign.JSONSignature.parse_jws_stream, io.StringIO(js.jws()), 64)
+
+    def test_parse_jws_stream_invalid(self):
+        payload = util.jose_base64_url_encode(b'{"a": 1,\n}').decode('utf-8')
+        for content in ('[]', '{"signatures": []}', '{"payload": "%s", "signatures": [{}]}' % payload):
+            self.assertRaises(jsonsign.JSONSignError, jsonsign.JSONSignature.parse_jws_stream, io.StringIO(content))
+
+    def test_sign_many(self):
+        js = self.create_js()
+        results = js.sign_many([self.rsa_private_key, self.ec_private_key], timestamp=1478423072, max_workers=2)
+        self.assertEqual(['RS256', 'ES256'], [algorithm for _, algorithm in results])
+        self.assertEqual(1, len(set(sign.protected for sign in js.signatures)))
+        self.assertEqual([self.rsa_private_key.public_key(), self.ec_private_key.public_key()], js.verify())
+
+        rsa_js = self.create_js()
+        rsa_js.sign(self.rsa_private_key, timestamp=1478423072)
+        self.assertEqual(rsa_js.signatures[0].signature, js.signatures[0].signature)
+
+    def test_slots(self):
+        js = self.create_js()
+        js.sign(self.rsa_private_key, timestamp=1478423072)
+        js = jsonsign.JSONSignature.parse_jws(js.jws())
+        sign = js.signatures[0]
+        for obj in (js, sign, sign.header, sign.header.jwk, self.rsa_private_key):
+            self.assertFalse(hasattr(obj, '__dict__'), type(obj).__name__)
+        self.assertEqual((), sign.header.chain)
+        self.assertEqual(self.rsa_private_key.key.private_numbers(), self.rsa_private_key.numbers)
+
+    def test_build_payload(self):
+        content = {'schemaVersion': 1, 'name': 'café', 'history': [{'v1Compatibility': 'x' * i} for i in range(50)]}
+        payload = util.dump_json(content, indent=3, separators=(',', ': '))
+        for chunk_size in (1, 7, 64, util.READ_CHUNK_SIZE):
+            payload_b64url, format_length, format_tail = jsonsign.build_payload(content, 3, chunk_size)
+            self.assertEqual(util.jose_base64_url_encode(payload.encode('utf-8')), payload_b64url)
+            self.assertEqual((len(payload) - 2, payload[-2:]), (format_length, format_tail))
+
+        js = jsonsign.JSONSignature.from_map(content, chunk_size=10)
+        js.sign(self.ec_private_key)
+        self.assertEqual(content, json.loads(util.jose_base64_url_decode(bytes(js.payload)).decode('utf-8')))
+        self.assertEqual([self.ec_private_key.public_key()], jsonsign.JSONSignature.parse_jws(js.jws()).verify())
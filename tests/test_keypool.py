@@ -0,0 +1,46 @@
+from __future__ import unicode_literals
+
+import time
+import unittest
+
+from libtrust import ec_key
+from libtrust import hash as hash_
+from libtrust import keypool
+from libtrust import rsa_key
+
+
+def wait_available(pool, kty, param, count, timeout=30):
+    deadline = time.time() + timeout
+    while pool.available(kty, param) < count and time.time() < deadline:
+        time.sleep(0.01)
+    return pool.available(kty, param)
+
+
+class GenerateTest(unittest.TestCase):
+    def test_generate(self):
+        private_key = rsa_key.generate_private_key(1024)
+        self.assertEqual(1024, private_key.key.key_size)
+        self.assertEqual('P-384', ec_key.generate_private_key('P-384').curve_name)
+        self.assertEqual('P-256', ec_key.generate_private_key().curve_name)
+        self.assertRaises(NotImplementedError, keypool.generate_private_key, 'oct', 256)
+
+
+class KeyPoolTest(unittest.TestCase):
+    def test_get(self):
+        with keypool.KeyPool([('EC', 'P-256'), ('RSA', 1024)], size=2, max_workers=2) as pool:
+            self.assertEqual(2, wait_available(pool, 'EC', 'P-256', 2))
+            self.assertEqual(2, wait_available(pool, 'RSA', 1024, 2))
+
+            keys = [pool.get('EC', 'P-256') for _ in range(3)]
+            self.assertEqual(3, len(set(private_key.key_id() for private_key in keys)))
+            self.assertEqual(2, wait_available(pool, 'EC', 'P-256', 2))
+
+            sig, alg = pool.get('RSA', 1024).sign(b'Hello', hash_.HashID.SHA256)
+            self.assertEqual('RS256', alg)
+            self.assertEqual('P-384', pool.get('EC', 'P-384').curve_name)
+            self.assertIsNone(pool.get('EC', 'P-384', block=False))
+
+    def test_processes(self):
+        with keypool.KeyPool([('EC', 'P-256')], size=1, max_workers=1, processes=True) as pool:
+            self.assertEqual(1, wait_available(pool, 'EC', 'P-256', 1))
+            self.assertIsInstance(pool.get('EC', 'P-256', block=False), ec_key.ECPrivateKey)
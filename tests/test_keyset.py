@@ -0,0 +1,59 @@
+from __future__ import unicode_literals
+
+import json
+import unittest
+
+from libtrust import ec_key
+from libtrust import keyset
+from libtrust import rsa_key
+from tests import fixtures_path
+
+
+class KeySetTest(unittest.TestCase):
+    def setUp(self):
+        with open(fixtures_path('private.pem'), 'rb') as f:
+            self.rsa_private_key = rsa_key.RSAPrivateKey.from_pem(f.read())
+        with open(fixtures_path('ec-public.pem'), 'rb') as f:
+            self.ec_public_key = keyset.load_pem_key(f.read())
+        self.key_set = keyset.KeySet([self.rsa_private_key])
+
+    def request(self, app, **environ):
+        responses = []
+        body = b''.join(app(environ, lambda status, headers: responses.append((status, dict(headers)))))
+        status, headers = responses[0]
+        return status, headers, body
+
+    def test_snapshot(self):
+        snapshot = self.key_set.snapshot()
+        self.assertIs(snapshot, self.key_set.snapshot())
+        self.assertEqual({'keys': [self.rsa_private_key.public_key().to_map()]}, json.loads(snapshot.body.decode('utf-8')))
+
+        self.key_set.add(self.rsa_private_key.public_key())
+        self.assertIs(snapshot, self.key_set.snapshot())
+
+        self.key_set.add(self.ec_public_key)
+        self.assertNotEqual(snapshot.etag, self.key_set.etag())
+        self.assertEqual(sorted([self.rsa_private_key.key_id(), self.ec_public_key.key_id()]), list(self.key_set))
+
+        self.key_set.remove(self.ec_public_key.key_id())
+        self.assertEqual(snapshot, self.key_set.snapshot())
+        self.assertIsInstance(self.key_set.get(self.rsa_private_key.key_id()), rsa_key.RSAPublicKey)
+        self.assertNotIn(self.ec_public_key.key_id(), self.key_set)
+        self.assertIsInstance(self.ec_public_key, ec_key.ECPublicKey)
+
+    def test_wsgi_app(self):
+        app = keyset.wsgi_app(self.key_set, max_age=60)
+        status, headers, body = self.request(app, REQUEST_METHOD='GET')
+        self.assertEqual('200 OK', status)
+        self.assertEqual(self.key_set.json_bytes(), body)
+        self.assertEqual((keyset.CONTENT_TYPE, str(len(body)), 'max-age=60'),
+                         (headers['Content-Type'], headers['Content-Length'], headers['Cache-Control']))
+
+        etag = headers['ETag']
+        status, headers, body = self.request(app, REQUEST_METHOD='GET', HTTP_IF_NONE_MATCH='"other", W/' + etag)
+        self.assertEqual(('304 Not Modified', etag, b''), (status, headers['ETag'], body))
+
+        self.key_set.add(self.ec_public_key)
+        status, headers, body = self.request(app, REQUEST_METHOD='HEAD', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(('200 OK', b''), (status, body))
+        self.assertEqual('405 Method Not Allowed', self.request(app, REQUEST_METHOD='POST')[0])
@@ -0,0 +1,59 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from libtrust import ec_key
+from libtrust import keystore
+from libtrust import rsa_key
+from tests import fixtures_path
+
+
+class KeyStoreTest(unittest.TestCase):
+    def setUp(self):
+        with open(fixtures_path('public.pem'), 'r') as f:
+            self.rsa_public_key = rsa_key.RSAPublicKey.from_pem(f.read().encode())
+        with open(fixtures_path('ec-public.pem'), 'r') as f:
+            self.ec_public_key = ec_key.ECPublicKey.from_pem(f.read().encode())
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'trusted_keys.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_write_and_get(self):
+        keystore.KeyStore.write(self.path, [self.rsa_public_key, self.ec_public_key, self.rsa_public_key])
+        with keystore.KeyStore(self.path) as store:
+            self.assertEqual(2, len(store))
+            self.assertEqual(sorted([self.rsa_public_key.key_id(), self.ec_public_key.key_id()]), list(store))
+            self.assertEqual(self.rsa_public_key, store[self.rsa_public_key.key_id()])
+            self.assertEqual(self.ec_public_key, store.get(self.ec_public_key.key_id()))
+            self.assertIs(store.get(self.ec_public_key.key_id()), store.get(self.ec_public_key.key_id()))
+            self.assertIsNone(store.get('AAAA:AAAA'))
+            self.assertNotIn('ZZZZ', store)
+            self.assertRaises(KeyError, store.__getitem__, 'ZZZZ')
+
+    def test_invalid_kid(self):
+        keystore.KeyStore.write(self.path, [self.rsa_public_key])
+        with keystore.KeyStore(self.path) as store:
+            for kid in ('x' * 100, '\u4f60\u597d'):
+                self.assertNotIn(kid, store)
+                self.assertIsNone(store.get(kid))
+                self.assertRaises(KeyError, store.__getitem__, kid)
+
+    def test_update(self):
+        keystore.KeyStore.write(self.path, [self.rsa_public_key])
+        keystore.KeyStore.update(self.path, [self.ec_public_key])
+        with keystore.KeyStore(self.path) as store:
+            self.assertIn(self.rsa_public_key.key_id(), store)
+            self.assertEqual(self.ec_public_key, store[self.ec_public_key.key_id()])
+
+    def test_invalid_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a key store')
+        self.assertRaises(keystore.KeyStoreError, keystore.KeyStore, self.path)
+
+        open(self.path, 'wb').close()
+        self.assertRaises(keystore.KeyStoreError, keystore.KeyStore, self.path)
@@ -0,0 +1,53 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from libtrust import kidindex
+from libtrust import rsa_key
+from tests import fixtures_path
+
+
+class KeyIDIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = kidindex.KeyIDIndex.from_pairs([
+            ('ABCD:EFGH:IJKL:MNOP', 1),
+            ('ABCD:EFGZ:IJKL:MNOP', 2),
+            ('ABCE:AAAA:AAAA:AAAA', 3),
+            ('ZZZZ:ZZZZ:ZZZZ:ZZZZ', 4),
+        ])
+
+    def test_normalize_kid(self):
+        self.assertEqual('ABCDEF', kidindex.normalize_kid(' abcd:ef '))
+        self.assertEqual('ABCDEF', kidindex.normalize_kid(b'ABCD:EF'))
+
+    def test_get(self):
+        self.assertEqual(4, len(self.index))
+        self.assertEqual(1, self.index.get('ABCD:EFGH:IJKL:MNOP'))
+        self.assertEqual(2, self.index.get('abcdefgzijklmnop'))
+        self.assertIsNone(self.index.get('ABCD'))
+        self.assertIn('ZZZZ:ZZZZ:ZZZZ:ZZZZ', self.index)
+        self.assertNotIn('ZZZZ:ZZZZ:ZZZZ:ZZZY', self.index)
+
+    def test_search(self):
+        self.assertEqual([1, 2, 3], self.index.search('ABC'))
+        self.assertEqual([1, 2], self.index.search('abcd:ef'))
+        self.assertEqual([1], self.index.search('ABCD:EFGH'))
+        self.assertEqual([1], self.index.search('ABCD:EF', limit=1))
+        self.assertEqual([], self.index.search('ABCD:EFGA'))
+        self.assertEqual([1, 2, 3, 4], self.index.search(''))
+        self.assertEqual(2, self.index.count('ABCD'))
+
+    def test_put(self):
+        self.index.put('ABCD:AAAA:AAAA:AAAA', 5)
+        self.index.put('ABCD:EFGH:IJKL:MNOP', 6)
+        self.assertEqual([5, 6, 2], self.index.search('ABCD'))
+        self.assertEqual(5, len(self.index))
+
+    def test_public_keys(self):
+        with open(fixtures_path('private.pem'), 'rb') as f:
+            public_key = rsa_key.RSAPrivateKey.from_pem(f.read()).public_key()
+        index = kidindex.KeyIDIndex([public_key])
+        kid = public_key.key_id()
+        self.assertIs(public_key, index.get(kid))
+        self.assertEqual([public_key], index.search(kid[:7]))
+        self.assertEqual([public_key], list(index))
@@ -0,0 +1,56 @@
+from __future__ import unicode_literals
+
+import itertools
+import unittest
+
+from libtrust import ec_key
+from libtrust import jsonsign
+from libtrust import pipeline
+from libtrust import policy
+from libtrust import rsa_key
+from tests import fixtures_path
+
+
+class PipelineTest(unittest.TestCase):
+    def setUp(self):
+        with open(fixtures_path('private.pem'), 'r') as f:
+            self.rsa_private_key = rsa_key.RSAPrivateKey.from_pem(f.read().encode())
+        with open(fixtures_path('ec-private.pem'), 'r') as f:
+            self.ec_private_key = ec_key.ECPrivateKey.from_pem(f.read().encode())
+
+        js = jsonsign.JSONSignature.from_map({'hello': '123'})
+        js.sign_many([self.rsa_private_key, self.ec_private_key], timestamp=1478423072)
+        self.jws = js.jws()
+        tampered = jsonsign.JSONSignature.parse_jws(self.jws)
+        tampered.signatures[0].signature = tampered.signatures[1].signature
+        self.tampered = tampered.jws()
+
+    def test_ordered(self):
+        documents = [self.jws, '{', self.tampered, jsonsign.JSONSignature.parse_jws(self.jws)]
+        results = list(pipeline.verify_stream(documents, max_workers=2, max_in_flight=2))
+        self.assertEqual([0, 1, 2, 3], [result.index for result in results])
+        self.assertEqual([2, None, None, 2], [result.keys and len(result.keys) for result in results])
+        self.assertEqual([False, True, True, False], [result.error is not None for result in results])
+
+        results = list(pipeline.verify_stream(documents, max_workers=2, policy=policy.any_of()))
+        self.assertEqual([False, True, False, False], [result.error is not None for result in results])
+
+    def test_unordered(self):
+        documents = [self.jws] * 20 + ['{}']
+        results = list(pipeline.verify_stream(documents, max_workers=4, max_in_flight=4, ordered=False))
+        self.assertEqual(list(range(21)), sorted(result.index for result in results))
+        self.assertEqual(1, len([result for result in results if result.error is not None]))
+
+    def test_backpressure(self):
+        pulled = []
+
+        def documents():
+            for i in itertools.count():
+                pulled.append(i)
+                yield self.jws
+
+        results = pipeline.verify_stream(documents(), max_workers=2, max_in_flight=4)
+        for result in itertools.islice(results, 50):
+            self.assertIsNone(result.error)
+            self.assertLessEqual(len(pulled), result.index + 1 + 3 * 4)
+        results.close()
@@ -0,0 +1,70 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from libtrust import ec_key
+from libtrust import jsonsign
+from libtrust import policy
+from libtrust import rsa_key
+from libtrust import trace
+from tests import fixtures_path
+
+
+class PolicyTest(unittest.TestCase):
+    def setUp(self):
+        with open(fixtures_path('private.pem'), 'r') as f:
+            self.rsa_private_key = rsa_key.RSAPrivateKey.from_pem(f.read().encode())
+        with open(fixtures_path('ec-private.pem'), 'r') as f:
+            self.ec_private_key = ec_key.ECPrivateKey.from_pem(f.read().encode())
+        self.rsa_kid = self.rsa_private_key.key_id()
+        self.ec_kid = self.ec_private_key.key_id()
+
+        js = jsonsign.JSONSignature.from_map({'hello': '123'})
+        js.sign_many([self.ec_private_key, self.rsa_private_key], timestamp=1478423072)
+        self.jws = js.jws()
+
+        self.verified = []
+        trace.add_hook(self.on_event)
+
+    def tearDown(self):
+        trace.remove_hook(self.on_event)
+
+    def on_event(self, event):
+        if event.phase == trace.VERIFY:
+            self.verified.append(event.key_type)
+
+    def parse(self):
+        return jsonsign.JSONSignature.parse_jws(self.jws)
+
+    def test_all_of(self):
+        self.assertEqual(2, len(self.parse().verify(policy=policy.all_of())))
+        self.assertEqual(['RSA', 'EC'], self.verified)
+        self.assertRaises(jsonsign.JSONSignError, self.parse().verify, policy=policy.all_of([self.ec_kid]))
+
+    def test_any_of(self):
+        keys = self.parse().verify(policy=policy.any_of())
+        self.assertEqual([self.rsa_kid], [public_key.key_id() for public_key in keys])
+        self.assertEqual(['RSA'], self.verified)
+
+        keys = self.parse().verify(policy=policy.any_of([self.ec_kid]))
+        self.assertEqual([self.ec_kid], [public_key.key_id() for public_key in keys])
+        self.assertEqual(['RSA', 'EC'], self.verified)
+
+        self.assertRaises(jsonsign.JSONSignError, self.parse().verify, policy=policy.any_of(['unknown']))
+        self.assertEqual(['RSA', 'EC'], self.verified)
+
+    def test_quorum(self):
+        js = self.parse()
+        rsa_sign = [sign for sign in js.signatures if sign.header.jwk.key_id() == self.rsa_kid][0]
+        rsa_sign.signature = js.signatures[0].signature[::-1]
+
+        keys = js.verify(policy=policy.quorum(1))
+        self.assertEqual([self.ec_kid], [public_key.key_id() for public_key in keys])
+        self.assertRaises(jsonsign.JSONSignError, js.verify, policy=policy.quorum(2))
+        self.assertEqual(2, len(self.parse().verify(policy=policy.quorum(2))))
+        self.assertRaises(jsonsign.JSONSignError, self.parse().verify, policy=policy.quorum(3))
+        self.assertRaises(ValueError, policy.quorum, 0)
+
+    def test_verify_cost(self):
+        self.assertLess(policy.verify_cost(rsa_key.generate_private_key(2048).public_key()),
+                        policy.verify_cost(self.ec_private_key.public_key()))
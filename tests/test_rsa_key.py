@@ -116,3 +116,32 @@ class RSAKeyTest(unittest.TestCase):
             self.assertTrue(self.public_key.verify(message, alg, sig))
 
             self.assertEqual(origin_sig[i], list(six.iterbytes(sig)))
+
+    def test_sign_bytes(self):
+        message = b'Hello, World!'
+        sig, alg = self.private_key.sign(message, hash_.HashID.SHA256)
+        self.assertTrue(self.public_key.verify(six.StringIO(u'Hello, World!'), alg, sig))
+        self.assertTrue(self.public_key.verify(memoryview(message), alg, sig))
+        self.assertTrue(self.public_key.verify((b'Hello', b', ', bytearray(b'World!')), alg, sig))
+
+    def test_equal_and_hash(self):
+        self.assertEqual(self.public_key, self.private_key.public_key())
+        self.assertEqual(self.public_key, self.private_key)
+        self.assertNotEqual(self.public_key, object())
+        self.assertEqual(1, len({self.public_key, self.private_key.public_key()}))
+        self.assertIs(self.public_key.key_id(), self.public_key.key_id())
+
+    def test_registered_algorithm(self):
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding
+
+        def pss():
+            return padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=32)
+
+        self.assertRaises(NotImplementedError, self.public_key.verify, b'Hello', 'PS256', b'')
+        hash_.register_signature_algorithm(hash_.SignatureAlgorithm('PS256', hash_.HashID.SHA256, 'RSA', pss))
+        self.addCleanup(hash_.unregister_signature_algorithm, 'PS256')
+        sig = self.private_key.crypto_private_key().sign(b'Hello', pss(), hashes.SHA256())
+        self.assertTrue(self.public_key.verify(b'Hello', 'PS256', sig))
+        self.assertRaises(NotImplementedError, self.public_key.verify, b'Hello', 'ES256', sig)
+        self.assertEqual('RS256', self.private_key.sign(b'Hello', hash_.HashID.SHA256)[1])
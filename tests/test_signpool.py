@@ -0,0 +1,33 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from libtrust import ec_key
+from libtrust import hash as hash_
+from libtrust import jsonsign
+from libtrust import rsa_key
+from libtrust import signpool
+from tests import fixtures_path
+
+
+class SigningPoolTest(unittest.TestCase):
+    def setUp(self):
+        with open(fixtures_path('private.pem'), 'r') as f:
+            self.rsa_private_key = rsa_key.RSAPrivateKey.from_pem(f.read().encode())
+        with open(fixtures_path('ec-private.pem'), 'r') as f:
+            self.ec_private_key = ec_key.ECPrivateKey.from_pem(f.read().encode())
+
+    def test_sign(self):
+        with signpool.SigningPool(self.rsa_private_key, processes=2) as pool:
+            sig, alg = pool.sign(b'Hello, World!', hash_.HashID.SHA256)
+            self.assertEqual(self.rsa_private_key.sign(b'Hello, World!', hash_.HashID.SHA256), (sig, alg))
+
+            results = pool.sign_many([b'a', (b'b', b'c')])
+            self.assertTrue(self.rsa_private_key.public_key().verify(b'a', results[0][1], results[0][0]))
+            self.assertTrue(self.rsa_private_key.public_key().verify(b'bc', results[1][1], results[1][0]))
+
+    def test_json_signature(self):
+        with signpool.SigningPool(self.ec_private_key, processes=1, warm_up=False) as pool:
+            js = jsonsign.JSONSignature.from_map({'hello': '123'})
+            js.sign(pool, timestamp=1478423072)
+            self.assertEqual([self.ec_private_key.public_key()], js.verify())
@@ -0,0 +1,51 @@
+from __future__ import unicode_literals
+
+import collections
+import unittest
+
+from libtrust import jsonsign
+from libtrust import rsa_key
+from libtrust import trace
+from tests import fixtures_path
+
+
+class TraceTest(unittest.TestCase):
+    def setUp(self):
+        with open(fixtures_path('private.pem'), 'r') as f:
+            self.private_key = rsa_key.RSAPrivateKey.from_pem(f.read().encode())
+        self.events = []
+        trace.add_hook(self.events.append)
+
+    def tearDown(self):
+        trace.remove_hook(self.events.append)
+
+    def test_phases(self):
+        js = jsonsign.JSONSignature.from_map({'hello': '123'})
+        js.sign(self.private_key, timestamp=1478423072)
+        jsonsign.JSONSignature.parse_jws(js.jws()).verify()
+
+        phases = [event.phase for event in self.events]
+        self.assertEqual([
+            trace.PROTECTED_HEADER, trace.DIGEST, trace.CRYPTO_SIGN, trace.SIGN,
+            trace.PARSE_JSON, trace.DECODE_PAYLOAD, trace.PARSE_JWK,
+            trace.DECODE_SIGNATURE, trace.DIGEST, trace.CRYPTO_VERIFY, trace.VERIFY,
+        ], phases)
+
+        verify = self.events[-1]
+        self.assertEqual(('RSA', 'RS256'), (verify.key_type, verify.algorithm))
+        self.assertEqual(len(js.sign_bytes(js.signatures[0].protected)), verify.payload_size)
+        self.assertTrue(all(event.elapsed_ns >= 0 for event in self.events))
+
+    def test_no_hook(self):
+        trace.remove_hook(self.events.append)
+        self.assertIsNone(trace.start())
+        # The key is not looked at without a hook
+        trace.finish(None, trace.VERIFY, object())
+        self.assertEqual([], self.events)
+
+    def test_key_type(self):
+        self.assertEqual('RSA', trace.key_type(self.private_key))
+        self.assertEqual('EC', trace.key_type('EC'))
+        self.assertIsNone(trace.key_type(None))
+        signer = collections.namedtuple('Signer', ('public_key',))(self.private_key.public_key)
+        self.assertEqual('RSA', trace.key_type(signer))
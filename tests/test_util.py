@@ -0,0 +1,35 @@
+from __future__ import unicode_literals
+
+import binascii
+import unittest
+
+from libtrust import util
+
+
+class Base64URLTest(unittest.TestCase):
+    def test_round_trip(self):
+        for data in (b'', b'a', b'ab', b'abc', b'\xfb\xff\xfe' * 5):
+            encoded = util.jose_base64_url_encode(data)
+            self.assertNotIn(b'=', encoded)
+            self.assertEqual(data, util.jose_base64_url_decode(encoded))
+            self.assertEqual(data, util.jose_base64_url_decode(encoded.decode('ascii')))
+        self.assertEqual(b'-_8', util.jose_base64_url_encode(b'\xfb\xff'))
+
+    def test_decode(self):
+        self.assertEqual(b'abc', util.jose_base64_url_decode(b'Y W\nJj'))
+        self.assertRaises(binascii.Error, util.jose_base64_url_decode, b'YWJjZ')
+        self.assertEqual([b'a', b'ab', b''], util.jose_base64_url_decode_many([b'YQ', 'YWI', b'']))
+
+    def test_is_canonical(self):
+        self.assertTrue(util.is_canonical_base64_url(b'YWJjZA'))
+        self.assertTrue(util.is_canonical_base64_url(b'-_8'))
+        self.assertTrue(util.is_canonical_base64_url(b''))
+        # Decode to the same bytes as the canonical forms above
+        for data in (b'YWJjZR', b'YWJjZA==', b'YWJj ZA', b'+/8', b'YWJjZ', b'YWJj*ZA'):
+            self.assertFalse(util.is_canonical_base64_url(data), data)
+
+    def test_incremental_encoder(self):
+        encoder = util.JoseBase64URLEncoder()
+        for chunk in (b'a', b'bcd', b'', b'ef'):
+            encoder.update(chunk)
+        self.assertEqual(util.jose_base64_url_encode(b'abcdef'), bytes(encoder.finalize()))